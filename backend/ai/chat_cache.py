@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import AsyncIterator, Callable, Dict, Hashable, List, Optional, Tuple
+
+from backend.core.cache import LRUCache
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def history_fingerprint(history: Optional[List[Dict]]) -> str:
+    if not history:
+        return ""
+    encoded = json.dumps(history, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class CachedAnswer:
+    def __init__(self, tokens: Tuple[str, ...], created: float):
+        self.tokens = tokens
+        self.created = created
+
+
+class _Flight:
+    """One upstream call in progress; every subscriber sees the full token stream from the start."""
+
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+    async def push(self, token: str):
+        async with self.changed:
+            self.tokens.append(token)
+            self.changed.notify_all()
+
+    async def finish(self, error: Optional[BaseException] = None):
+        async with self.changed:
+            self.done = True
+            self.error = error
+            self.changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        seen = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: len(self.tokens) > seen or self.done)
+                new = self.tokens[seen:]
+                finished, error = self.done, self.error
+            seen += len(new)
+            for token in new:
+                yield token
+            if finished and seen == len(self.tokens):
+                if error is not None:
+                    raise error
+                return
+
+
+class ChatResponseCache:
+    """Finished LLM answers by (query, date, data version, model, history), with TTL and LRU eviction.
+
+    Identical requests that arrive while an answer is still streaming join the
+    in-flight upstream call instead of starting their own (single flight). The
+    upstream call runs in its own task, so it completes and fills the cache even
+    if the client that started it disconnects.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 900):
+        self.entries = LRUCache(max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.flights: Dict[Hashable, _Flight] = {}
+        self.coalesced = 0
+        self.expired = 0
+
+    def get(self, key: Hashable) -> Optional[CachedAnswer]:
+        answer = self.entries.get(key)
+        if answer is not None and time.monotonic() - answer.created > self.ttl_seconds:
+            self.expired += 1
+            return None
+        return answer
+
+    async def _run(self, key: Hashable, flight: _Flight, produce: Callable[[], AsyncIterator[str]]):
+        error: Optional[BaseException] = None
+        try:
+            async for token in produce():
+                await flight.push(token)
+            self.entries.put(key, CachedAnswer(tuple(flight.tokens), time.monotonic()))
+        except Exception as e:
+            error = e
+        except BaseException as e:
+            # Cancellation belongs to this task; subscribers get an ordinary error they can fall back on
+            error = RuntimeError(f"Upstream call ended by {type(e).__name__}")
+            raise
+        finally:
+            self.flights.pop(key, None)
+            # Released however the call ended, so no subscriber waits on a flight that is gone
+            await flight.finish(error)
+
+    async def stream(self, key: Hashable, produce: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Tokens for `key`: replayed from the cache, shared with an identical call in flight, or
+        produced by a new upstream call. An upstream failure is raised to every subscriber and
+        nothing is cached."""
+        answer = self.get(key)
+        if answer is not None:
+            for token in answer.tokens:
+                yield token
+            return
+
+        flight = self.flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self.flights[key] = flight
+            flight.task = asyncio.create_task(self._run(key, flight, produce))
+        else:
+            self.coalesced += 1
+        async for token in flight.subscribe():
+            yield token
+
+    def stats(self) -> Dict:
+        return {
+            **self.entries.stats(),
+            "ttl_seconds": self.ttl_seconds,
+            "expired": self.expired,
+            "in_flight": len(self.flights),
+            "coalesced": self.coalesced,
+        }
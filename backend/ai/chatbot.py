@@ -1,14 +1,32 @@
 import os
-from typing import List, Dict, Optional, AsyncGenerator
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Dict, Optional, AsyncGenerator, Tuple
 from datetime import datetime
 
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
+from backend.ai.chat_cache import ChatResponseCache, history_fingerprint, normalize_query
 from backend.ai.prompts import SYSTEM_PROMPT, DATA_CONTEXT, QUICK_QUERIES
+from backend.ai.token_budget import BudgetedPrompt, PromptBudget, TokenStats, count_tokens
+from backend.core.cache import LRUCache
+
+# Most recent conversation turns sent verbatim with each question, budget permitting
+HISTORY_TURNS = 10
+
+# Context block -> query words that pull it into the prompt
+CONTEXT_KEYWORDS = {
+    "queue": ["queue", "wait", "compliance", "entry", "check-in", "security"],
+    "security": ["security", "lane", "reject", "screening"],
+    "pax": ["passenger", "pax", "volume", "traffic", "peak"],
+    "voc": ["complaint", "feedback", "customer", "voc", "sentiment"],
+}
 
 
 class AirportChatbot:
@@ -24,7 +42,7 @@ class AirportChatbot:
             api_key = os.getenv("GEMINI_API_KEY")
             if api_key and OPENAI_AVAILABLE:
                 try:
-                    self.client = OpenAI(
+                    self.client = AsyncOpenAI(
                         api_key=api_key,
                         base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
                     )
@@ -37,7 +55,7 @@ class AirportChatbot:
             api_key = os.getenv("OPENAI_API_KEY")
             if api_key and OPENAI_AVAILABLE:
                 try:
-                    self.client = OpenAI(api_key=api_key)
+                    self.client = AsyncOpenAI(api_key=api_key)
                     self.model = config["ai"]["models"]["openai"]
                     print(f"[+] OpenAI client initialized (model: {self.model})")
                 except Exception as e:
@@ -45,131 +63,221 @@ class AirportChatbot:
                     self.client = None
 
         self.conversation_history: List[Dict] = []
+        # Context building and fallback answers run pandas analyses; they get their own
+        # threads so a burst of chats neither blocks the event loop nor starves to_thread users
+        self.executor = ThreadPoolExecutor(max_workers=config["ai"].get("context_workers", 4), thread_name_prefix="chat-context")
+
+        cache_config = config["ai"].get("response_cache", {})
+        self.response_cache = None
+        if cache_config.get("enabled", True):
+            self.response_cache = ChatResponseCache(cache_config.get("max_entries", 512), cache_config.get("ttl_seconds", 900))
+
+        budget_config = config["ai"].get("prompt_budget", {})
+        self.prompt_budget = PromptBudget(budget_config.get("max_tokens", 3000), budget_config.get("summary_tokens", 150), HISTORY_TURNS,
+                                          budget_config.get("query_tokens", 500))
+        self.tokens = TokenStats()
+
+    async def _run_blocking(self, fn: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        # Carry the caller's context so a pinned data snapshot is honoured in the worker
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, functools.partial(context.run, fn, *args))
+
+    def _context_cache(self, data_loader) -> LRUCache:
+        # One cache per data snapshot, like the reasoning engine's analysis cache
+        return LRUCache(self.config["ai"].get("context_cache_size", 256))
+
+    def context_cache_stats(self) -> Dict:
+        return self.reasoning_engine.data_loader.derived(self._context_cache).stats()
+
+    def response_cache_stats(self) -> Optional[Dict]:
+        return self.response_cache.stats() if self.response_cache is not None else None
+
+    def token_stats(self) -> Dict:
+        return {"budget_tokens": self.prompt_budget.max_tokens, **self.tokens.stats()}
+
+    def _render_queue(self, date: datetime) -> List[str]:
+        queue_analysis = self.reasoning_engine.analyze_queue_compliance(date)
+        lines = ["### Current Queue Compliance Status:"]
+        lines.append(f"- Overall Compliance: {queue_analysis['overall_compliance']:.1f}%")
+        lines.append(f"- Zones Below Target: {queue_analysis['zones_below_target']}")
+        lines.append(f"- Passengers Affected: {queue_analysis['total_pax_affected']:,}")
+        if queue_analysis["worst_zones"]:
+            lines.append("\nWorst Performing Zones:")
+            for zone in queue_analysis["worst_zones"]:
+                lines.append(f"  - {zone['zone']}: {zone['actual_compliance_pct']:.1f}% (Target: 95%)")
+        return lines
+
+    def _render_security(self, date: datetime) -> List[str]:
+        security_analysis = self.reasoning_engine.analyze_security_lanes(date)
+        lines = ["\n### Security Lane Performance:"]
+        lines.append(f"- Total Cleared: {security_analysis['total_cleared']:,}")
+        lines.append(f"- Average Reject Rate: {security_analysis['avg_reject_rate']}%")
+        if security_analysis["high_reject_lanes"]:
+            lines.append("\nHigh Reject Rate Lanes:")
+            for lane in security_analysis["high_reject_lanes"][:3]:
+                lines.append(f"  - {lane['lane']}: {lane['reject_rate_pct']}% reject rate")
+        return lines
+
+    def _render_pax(self, date: datetime) -> List[str]:
+        pax_analysis = self.reasoning_engine.analyze_passenger_volumes(date)
+        return [
+            "\n### Passenger Volumes:",
+            f"- Total: {pax_analysis['total_pax']:,}",
+            f"- Domestic: {pax_analysis['domestic_pax']:,}",
+            f"- International: {pax_analysis['international_pax']:,}",
+            f"- vs 7-day avg: {pax_analysis['vs_7day_pct']:+.1f}%",
+        ]
 
-    def _build_data_context(self, query: str, date: datetime) -> str:
-        context_parts = [DATA_CONTEXT, "", f"**Analyzing data for:** {date.strftime('%B %d, %Y')}", ""]
-        query_lower = query.lower()
-
-        if any(word in query_lower for word in ["queue", "wait", "compliance", "entry", "check-in", "security"]):
-            queue_analysis = self.reasoning_engine.analyze_queue_compliance(date)
-            context_parts.append("### Current Queue Compliance Status:")
-            context_parts.append(f"- Overall Compliance: {queue_analysis['overall_compliance']:.1f}%")
-            context_parts.append(f"- Zones Below Target: {queue_analysis['zones_below_target']}")
-            context_parts.append(f"- Passengers Affected: {queue_analysis['total_pax_affected']:,}")
-            if queue_analysis["worst_zones"]:
-                context_parts.append("\nWorst Performing Zones:")
-                for zone in queue_analysis["worst_zones"]:
-                    context_parts.append(f"  - {zone['zone']}: {zone['actual_compliance_pct']:.1f}% (Target: 95%)")
+    def _render_voc(self, date: datetime) -> List[str]:
+        voc_analysis = self.reasoning_engine.analyze_voc_sentiment(date)
+        return [
+            "\n### Voice of Customer:",
+            f"- Compliments: {voc_analysis['total_compliments']}",
+            f"- Complaints: {voc_analysis['total_complaints']}",
+            f"- Ratio: {voc_analysis['ratio']:.2f} (Sentiment: {voc_analysis['sentiment']})",
+        ]
 
-        if any(word in query_lower for word in ["security", "lane", "reject", "screening"]):
-            security_analysis = self.reasoning_engine.analyze_security_lanes(date)
-            context_parts.append("\n### Security Lane Performance:")
-            context_parts.append(f"- Total Cleared: {security_analysis['total_cleared']:,}")
-            context_parts.append(f"- Average Reject Rate: {security_analysis['avg_reject_rate']}%")
-            if security_analysis["high_reject_lanes"]:
-                context_parts.append("\nHigh Reject Rate Lanes:")
-                for lane in security_analysis["high_reject_lanes"][:3]:
-                    context_parts.append(f"  - {lane['lane']}: {lane['reject_rate_pct']}% reject rate")
-
-        if any(word in query_lower for word in ["passenger", "pax", "volume", "traffic", "peak"]):
-            pax_analysis = self.reasoning_engine.analyze_passenger_volumes(date)
-            context_parts.append("\n### Passenger Volumes:")
-            context_parts.append(f"- Total: {pax_analysis['total_pax']:,}")
-            context_parts.append(f"- Domestic: {pax_analysis['domestic_pax']:,}")
-            context_parts.append(f"- International: {pax_analysis['international_pax']:,}")
-            context_parts.append(f"- vs 7-day avg: {pax_analysis['vs_7day_pct']:+.1f}%")
-
-        if any(word in query_lower for word in ["complaint", "feedback", "customer", "voc", "sentiment"]):
-            voc_analysis = self.reasoning_engine.analyze_voc_sentiment(date)
-            context_parts.append("\n### Voice of Customer:")
-            context_parts.append(f"- Compliments: {voc_analysis['total_compliments']}")
-            context_parts.append(f"- Complaints: {voc_analysis['total_complaints']}")
-            context_parts.append(f"- Ratio: {voc_analysis['ratio']:.2f} (Sentiment: {voc_analysis['sentiment']})")
+    def _render_overview(self, date: datetime) -> List[str]:
+        queue_analysis = self.reasoning_engine.analyze_queue_compliance(date)
+        security_analysis = self.reasoning_engine.analyze_security_lanes(date)
+        pax_analysis = self.reasoning_engine.analyze_passenger_volumes(date)
+        voc_analysis = self.reasoning_engine.analyze_voc_sentiment(date)
+        return [
+            f"\n### Overview:",
+            f"- Total PAX: {pax_analysis['total_pax']:,}",
+            f"- Queue Compliance: {queue_analysis['overall_compliance']:.1f}%",
+            f"- Avg Reject Rate: {security_analysis['avg_reject_rate']}%",
+            f"- VOC Ratio: {voc_analysis['ratio']:.2f}",
+        ]
 
+    def _context_blocks(self, query: str) -> List[str]:
+        """Names of the context blocks a query needs, in prompt order."""
+        query_lower = query.lower()
+        blocks = [name for name, words in CONTEXT_KEYWORDS.items() if any(word in query_lower for word in words)]
         # If no specific keywords matched, include everything for general queries
-        if len(context_parts) <= 4:
-            queue_analysis = self.reasoning_engine.analyze_queue_compliance(date)
-            security_analysis = self.reasoning_engine.analyze_security_lanes(date)
-            pax_analysis = self.reasoning_engine.analyze_passenger_volumes(date)
-            voc_analysis = self.reasoning_engine.analyze_voc_sentiment(date)
-            context_parts.append(f"\n### Overview:")
-            context_parts.append(f"- Total PAX: {pax_analysis['total_pax']:,}")
-            context_parts.append(f"- Queue Compliance: {queue_analysis['overall_compliance']:.1f}%")
-            context_parts.append(f"- Avg Reject Rate: {security_analysis['avg_reject_rate']}%")
-            context_parts.append(f"- VOC Ratio: {voc_analysis['ratio']:.2f}")
-
-        return "\n".join(context_parts)
-
-    def chat_stream(self, query: str, date: Optional[datetime] = None, history: Optional[List[Dict]] = None):
-        """Streaming chat - yields chunks of text"""
+        return blocks or ["overview"]
+
+    def _cached_blocks(self, names: List[str], date: datetime) -> Optional[List[str]]:
+        cache = self.reasoning_engine.data_loader.derived(self._context_cache)
+        blocks = [cache.get((name, date)) for name in names]
+        return None if any(block is None for block in blocks) else blocks
+
+    def _context_block(self, name: str, date: datetime) -> str:
+        cache = self.reasoning_engine.data_loader.derived(self._context_cache)
+        block = cache.get((name, date))
+        if block is None:
+            block = "\n".join(getattr(self, f"_render_{name}")(date))
+            cache.put((name, date), block)
+        return block
+
+    def _assemble_context(self, date: datetime, blocks: List[str]) -> List[str]:
+        # The data overview and date come first; the budget drops trailing blocks before them
+        header = "\n".join([DATA_CONTEXT, "", f"**Analyzing data for:** {date.strftime('%B %d, %Y')}", ""])
+        return [header, *blocks]
+
+    def _build_data_context(self, query: str, date: datetime) -> List[str]:
+        return self._assemble_context(date, [self._context_block(name, date) for name in self._context_blocks(query)])
+
+    async def _data_context(self, query: str, date: datetime) -> List[str]:
+        # Rendered blocks are cached per (date, data version); only a miss needs the worker pool
+        blocks = self._cached_blocks(self._context_blocks(query), date)
+        if blocks is not None:
+            return self._assemble_context(date, blocks)
+        return await self._run_blocking(self._build_data_context, query, date)
+
+    async def build_prompt(self, query: str, date: datetime, history: Optional[List[Dict]] = None) -> Optional[BudgetedPrompt]:
+        """The token-budgeted messages for an LLM call, or None in fallback mode."""
+        if self.client is None:
+            return None
+        return self.prompt_budget.assemble(SYSTEM_PROMPT, await self._data_context(query, date), history, query)
+
+    def record_usage(self, prompt: Optional[BudgetedPrompt], response: str) -> Optional[Dict]:
+        """Token counts of one answered request, added to the running totals."""
+        if prompt is None:
+            return None
+        usage = {**prompt.usage, "completion": count_tokens(response)}
+        self.tokens.record(usage)
+        return usage
+
+    def _cache_key(self, query: str, date: datetime, prompt: BudgetedPrompt) -> tuple:
+        return (
+            normalize_query(query),
+            date.strftime("%Y-%m-%d"),
+            self.reasoning_engine.data_loader.version,
+            self.model,
+            # The conversation as actually sent, after budgeting
+            history_fingerprint(prompt.history),
+        )
+
+    async def _llm_stream(self, prompt: BudgetedPrompt) -> AsyncGenerator[str, None]:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=prompt.messages,
+            temperature=self.config["ai"]["temperature"],
+            max_tokens=self.config["ai"]["max_tokens"],
+            stream=True,
+        )
+
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def _answer_stream(self, query: str, date: datetime, prompt: BudgetedPrompt) -> AsyncGenerator[str, None]:
+        produce = functools.partial(self._llm_stream, prompt)
+        if self.response_cache is None:
+            return produce()
+        # Identical questions share one upstream call and are replayed from the cache afterwards
+        return self.response_cache.stream(self._cache_key(query, date, prompt), produce)
+
+    async def chat_stream(self, query: str, date: Optional[datetime] = None, history: Optional[List[Dict]] = None,
+                          prompt: Optional[BudgetedPrompt] = None) -> AsyncGenerator[str, None]:
+        """Streaming chat - yields chunks of text. `prompt` is one already built by build_prompt()."""
         if date is None:
             date = datetime.strptime(self.config["data"]["report_date"], "%Y-%m-%d")
 
-        data_context = self._build_data_context(query, date)
-
         if self.client is None:
-            fallback = self._fallback_response(query, date)
-            yield fallback
+            yield await self._run_blocking(self._fallback_response, query, date)
             return
 
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "system", "content": data_context},
-        ]
+        try:
+            if prompt is None:
+                prompt = await self.build_prompt(query, date, history)
+            async for token in self._answer_stream(query, date, prompt):
+                yield token
 
-        if history:
-            messages.extend(history[-10:])
+        except Exception as e:
+            print(f"[!] OpenAI streaming error: {e}. Falling back to rule-based response.")
+            yield await self._run_blocking(self._fallback_response, query, date)
 
-        messages.append({"role": "user", "content": query})
+    async def answer(self, query: str, date: datetime, history: Optional[List[Dict]] = None,
+                     prompt: Optional[BudgetedPrompt] = None) -> Tuple[str, str]:
+        """Full response and the mode that produced it: "openai", or "fallback" when no LLM
+        is configured or the LLM call failed."""
+        if self.client is None:
+            return await self._run_blocking(self._fallback_response, query, date), "fallback"
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=self.config["ai"]["temperature"],
-                max_tokens=self.config["ai"]["max_tokens"],
-                stream=True,
-            )
-
-            for chunk in response:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
-
+            if prompt is None:
+                prompt = await self.build_prompt(query, date, history)
+            # Streamed upstream too, so it can share a call with concurrent streaming requests
+            return "".join([token async for token in self._answer_stream(query, date, prompt)]), "openai"
         except Exception as e:
-            print(f"[!] OpenAI streaming error: {e}. Falling back to rule-based response.")
-            yield self._fallback_response(query, date)
+            print(f"[!] OpenAI error: {e}. Falling back to rule-based response.")
+            return await self._run_blocking(self._fallback_response, query, date), "fallback"
 
-    def chat(self, query: str, date: Optional[datetime] = None, history: Optional[List[Dict]] = None) -> str:
+    async def chat(self, query: str, date: Optional[datetime] = None, history: Optional[List[Dict]] = None) -> str:
         """Non-streaming chat - returns full response"""
         if date is None:
             date = datetime.strptime(self.config["data"]["report_date"], "%Y-%m-%d")
 
-        data_context = self._build_data_context(query, date)
-
-        if self.client is None:
-            return self._fallback_response(query, date)
-
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "system", "content": data_context},
-        ]
-
-        if history:
-            messages.extend(history[-10:])
+        response, _ = await self.answer(query, date, history)
+        return response
 
-        messages.append({"role": "user", "content": query})
-
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=self.config["ai"]["temperature"],
-                max_tokens=self.config["ai"]["max_tokens"],
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"[!] OpenAI error: {e}. Falling back to rule-based response.")
-            return self._fallback_response(query, date)
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
     def _fallback_response(self, query: str, date: datetime) -> str:
         query_lower = query.lower()
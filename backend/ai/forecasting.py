@@ -0,0 +1,247 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from backend.core.cache import LRUCache
+from backend.core.config import CONFIG
+
+
+class SeasonalModel:
+    """Fitted state for every series of one family: trend x day of week x hour of day.
+
+    The forecast for series s on day t at hour h is
+
+        (a[s] + b[s] * t) * weekday[s, dow(t)] * profile[s, dow(t), h]
+
+    where the linear trend is fit to the daily level (mean over hours), `weekday`
+    scales that level per day of week, and `profile` splits it over the hours.
+    Day-of-week hour profiles are shrunk towards the series' overall profile, since
+    a few weeks of history give each weekday only a handful of observations.
+    Daily series are the same model with a single hour.
+    """
+
+    def __init__(self, a: np.ndarray, b: np.ndarray, weekday: np.ndarray, profile: np.ndarray,
+                 sigma: np.ndarray, origin: int, origin_dow: int, mape: float, lower: float, upper: Optional[float]):
+        self.a = a
+        self.b = b
+        self.weekday = weekday
+        self.profile = profile
+        self.sigma = sigma
+        self.origin = origin
+        self.origin_dow = origin_dow
+        self.mape = mape
+        self.lower = lower
+        self.upper = upper
+
+    def predict(self, horizon: int, gap: int = 0) -> Dict[str, np.ndarray]:
+        """Forecasts for the `horizon` days after origin + gap, each shaped (series, horizon, hours)."""
+        steps = np.arange(gap + 1, gap + horizon + 1)
+        dow = (self.origin_dow + steps) % 7
+        level = (self.a[:, None] + self.b[:, None] * (self.origin + steps)) * self.weekday[:, dow]
+        forecast = np.clip(level[:, :, None] * self.profile[:, dow, :], self.lower, self.upper)
+        # 95% band from the in-sample residual spread of each series and hour
+        spread = 1.96 * self.sigma[:, None, :]
+        return {
+            "forecast": forecast,
+            "lower": np.clip(forecast - spread, self.lower, self.upper),
+            "upper": np.clip(forecast + spread, self.lower, self.upper),
+        }
+
+
+def _masked_mean(values: np.ndarray, mask: np.ndarray, axis) -> np.ndarray:
+    total = np.where(mask, values, 0.0).sum(axis=axis)
+    count = mask.sum(axis=axis)
+    return np.divide(total, count, out=np.full(total.shape, np.nan), where=count > 0)
+
+
+def _by_weekday(values: np.ndarray, mask: np.ndarray, onehot: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum and count over days per day of week: (series, days[, hours]) -> (series, 7[, hours])."""
+    total = np.einsum("sd...,dw->sw...", np.where(mask, values, 0.0), onehot)
+    count = np.einsum("sd...,dw->sw...", mask.astype(np.float64), onehot)
+    return total, count
+
+
+def fit_seasonal(grid: np.ndarray, first_dow: int, lower: float = 0.0, upper: Optional[float] = None,
+                 shrinkage: float = 2.0) -> SeasonalModel:
+    """Fit every series of `grid` (series, days, hours; NaN where missing) at once."""
+    n_series, n_days, n_hours = grid.shape
+    observed = ~np.isnan(grid)
+    t = np.arange(n_days, dtype=np.float64)
+    dow = (first_dow + np.arange(n_days)) % 7
+    onehot = np.eye(7)[dow]
+
+    level = _masked_mean(grid, observed, axis=2)
+    has_level = ~np.isnan(level)
+
+    # Alternate between the trend of the weekday-adjusted level and the weekday factors
+    weekday = np.ones((n_series, 7))
+    for _ in range(2):
+        adjusted = level / weekday[:, dow]
+        n = has_level.sum(axis=1)
+        y = np.where(has_level, adjusted, 0.0)
+        tt = np.where(has_level, t, 0.0)
+        st, sy, stt, sty = tt.sum(axis=1), y.sum(axis=1), (tt * tt).sum(axis=1), (tt * y).sum(axis=1)
+        denominator = n * stt - st * st
+        b = np.divide(n * sty - st * sy, denominator, out=np.zeros(n_series), where=denominator > 0)
+        a = np.divide(sy - b * st, n, out=np.zeros(n_series), where=n > 0)
+
+        trend = a[:, None] + b[:, None] * t
+        ratio = np.divide(level, trend, out=np.full(level.shape, np.nan), where=has_level & (trend != 0))
+        total, count = _by_weekday(ratio, ~np.isnan(ratio), onehot)
+        weekday = np.divide(total, count, out=np.ones((n_series, 7)), where=count > 0)
+        weekday /= weekday.mean(axis=1, keepdims=True)
+
+    share = grid / level[:, :, None]
+    has_share = ~np.isnan(share)
+    overall = _masked_mean(share, has_share, axis=1)
+    total, count = _by_weekday(share, has_share, onehot)
+    by_weekday = np.divide(total, count, out=np.zeros(total.shape), where=count > 0)
+    weight = count / (count + shrinkage)
+    profile = weight * by_weekday + (1 - weight) * overall[:, None, :]
+
+    fitted = trend[:, :, None] * weekday[:, dow][:, :, None] * profile[:, dow, :]
+    residual = grid - fitted
+    n_obs = observed.sum(axis=1)
+    sigma = np.sqrt(np.divide(np.where(observed, residual ** 2, 0.0).sum(axis=1), np.maximum(n_obs - 1, 1)))
+    nonzero = observed & (grid != 0)
+    mape = float(np.abs(residual[nonzero] / grid[nonzero]).mean() * 100) if nonzero.any() else float("nan")
+
+    return SeasonalModel(a, b, weekday, profile, np.where(n_obs > 0, sigma, np.nan), n_days - 1, int(dow[-1]),
+                         mape, lower, upper)
+
+
+class SeriesFit:
+    """A fitted model and the series (key combinations) its rows are in."""
+
+    def __init__(self, model: SeasonalModel, series: pd.MultiIndex, end: pd.Timestamp):
+        self.model = model
+        self.series = series
+        self.end = end
+
+    def gap(self, origin) -> int:
+        """Days between the last day the fit saw and `origin` itself."""
+        return (pd.Timestamp(origin) - self.end).days
+
+
+class ForecastSeries:
+    """One family of series (e.g. show-ups per terminal and passenger type).
+
+    Nothing is held per data version: a fit for an origin date reads only the
+    trailing `history_days` it is fit on, projected to the key, date, hour and
+    metric columns, into a dense (series, days, hours) grid.
+    """
+
+    def __init__(self, name: str, dataset: str, keys: List[str], metric: str, aggregation: str,
+                 hourly: bool, upper: Optional[float] = None):
+        self.name = name
+        self.dataset = dataset
+        self.keys = keys
+        self.metric = metric
+        self.aggregation = aggregation
+        self.hourly = hourly
+        self.upper = upper
+
+    @property
+    def columns(self) -> List[str]:
+        return [*self.keys, "date", *(["hour"] if self.hourly else []), self.metric]
+
+    def _grid(self, df: pd.DataFrame, codes: np.ndarray, n_series: int, first_date: pd.Timestamp, n_days: int) -> np.ndarray:
+        """(series, days, hours) grid of `df` from `first_date`, NaN where nothing was observed."""
+        days = ((df["date"] - first_date).dt.days).to_numpy()
+        hours = df["hour"].to_numpy(dtype=np.int64) if self.hourly else np.zeros(len(df), dtype=np.int64)
+        n_hours = 24 if self.hourly else 1
+
+        cell = (codes * n_days + days) * n_hours + hours
+        size = n_series * n_days * n_hours
+        total = np.bincount(cell, df[self.metric].to_numpy(dtype=np.float64), minlength=size)
+        count = np.bincount(cell, minlength=size)
+        if self.aggregation == "mean":
+            total = np.divide(total, count, out=np.zeros(size), where=count > 0)
+        return np.where(count > 0, total, np.nan).reshape(n_series, n_days, n_hours)
+
+    def fit(self, dl, origin, history_days: int) -> Optional[SeriesFit]:
+        """Fit on the `history_days` up to `origin` (or the last day with data, if earlier)."""
+        bounds = dl.date_bounds(self.dataset)
+        if bounds is None:
+            return None
+        first, last = bounds
+        end = min(pd.Timestamp(origin), last)
+        start = max(end - pd.Timedelta(days=history_days - 1), first)
+        n_days = (end - start).days + 1
+        if n_days < 7:
+            return None
+        df = dl.scan(self.dataset, self.columns, start, end)
+        df = df[df[self.metric].notna()]
+        if len(df) == 0:
+            return None
+        codes, series = pd.MultiIndex.from_frame(df[self.keys].astype(str)).factorize()
+        grid = self._grid(df, codes, len(series), start, n_days)
+        return SeriesFit(fit_seasonal(grid, start.dayofweek, upper=self.upper), series, end)
+
+    def actuals(self, dl, fit: SeriesFit, origin, horizon: int) -> np.ndarray:
+        """Observed values for the forecast days (NaN where not yet in the data)."""
+        first = pd.Timestamp(origin) + pd.Timedelta(days=1)
+        df = dl.range(self.dataset, first, first + pd.Timedelta(days=horizon - 1), self.columns)
+        df = df[df[self.metric].notna()]
+        codes = fit.series.get_indexer(pd.MultiIndex.from_frame(df[self.keys].astype(str)))
+        # Series that first appear after the fit have no forecast to compare with
+        known = codes >= 0
+        return self._grid(df[known], codes[known], len(fit.series), first, horizon)
+
+
+class Forecaster:
+    """Forecast families for one data version, with fits cached per origin date."""
+
+    def __init__(self, dl, series: List[ForecastSeries], history_days: int = 56, cache_size: int = 64):
+        self.dl = dl
+        self.series = {s.name: s for s in series}
+        self.history_days = history_days
+        self.models = LRUCache(cache_size)
+
+    def fit(self, name: str, origin) -> Optional[SeriesFit]:
+        key = (name, pd.Timestamp(origin))
+        fit = self.models.get(key)
+        if fit is None:
+            fit = self.series[name].fit(self.dl, origin, self.history_days)
+            if fit is not None:
+                self.models.put(key, fit)
+        return fit
+
+    def model(self, name: str, origin) -> Optional[SeasonalModel]:
+        fit = self.fit(name, origin)
+        return fit.model if fit is not None else None
+
+    def predict(self, name: str, origin, horizon: int) -> pd.DataFrame:
+        """Every series of `name` for each of the `horizon` days after `origin`, one row per hour."""
+        s = self.series[name]
+        fit = self.fit(name, origin)
+        if fit is None:
+            # Too little history: no rows, but the same column types as a forecast
+            return pd.DataFrame({
+                **{key: pd.Series(dtype=object) for key in s.keys},
+                "date": pd.Series(dtype="datetime64[ns]"),
+                "hour": pd.Series(dtype=np.int64),
+                **{column: pd.Series(dtype=np.float64) for column in ("forecast", "lower", "upper", "actual")},
+            })
+
+        values = {**fit.model.predict(horizon, fit.gap(origin)), "actual": s.actuals(self.dl, fit, origin, horizon)}
+        n_series, _, n_hours = values["forecast"].shape
+        dates = pd.date_range(pd.Timestamp(origin) + pd.Timedelta(days=1), periods=horizon)
+        keys = fit.series.to_frame(index=False, name=s.keys)
+        frame = pd.DataFrame({
+            **{key: np.repeat(keys[key].to_numpy(), horizon * n_hours) for key in s.keys},
+            "date": np.tile(np.repeat(dates, n_hours), n_series),
+            "hour": np.tile(np.arange(n_hours), n_series * horizon),
+            **{column: value.reshape(-1) for column, value in values.items()},
+        })
+        # Hours a series never operates in have no profile
+        return frame[frame["forecast"].notna()].reset_index(drop=True)
+
+
+def build_forecaster(dl) -> Forecaster:
+    config = CONFIG["ai"].get("forecasting", {})
+    return Forecaster(dl, [
+        ForecastSeries("pax", "pax_hourly_showup", ["terminal", "passenger_type"], "volume", "sum", hourly=True),
+        ForecastSeries("queue", "queue_hourly_compliance", ["zone"], "actual_compliance_pct", "mean", hourly=True, upper=100.0),
+        ForecastSeries("atm", "atm_daily", ["terminal", "flow", "type"], "atm_count", "sum", hourly=False),
+    ], history_days=config.get("history_days", 56), cache_size=config.get("model_cache_size", 64))
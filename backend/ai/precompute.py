@@ -0,0 +1,106 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from backend.ai.chat_cache import normalize_query
+from backend.ai.prompts import DEMO_PROMPTS, QUICK_QUERIES
+
+
+class PrecomputedAnswer:
+    def __init__(self, response: str, mode: str):
+        self.response = response
+        self.mode = mode
+
+
+class AnswerPrecomputer:
+    """Answers every demo prompt and quick query for the most recent dates in the background.
+
+    Runs at startup and again after each data reload. Answers are stored per
+    (query, date, data version), so a reload never serves answers computed from
+    the previous data.
+    """
+
+    def __init__(self, chatbot, data_loader, report_date: str, days: int = 3, concurrency: int = 4):
+        self.chatbot = chatbot
+        self.data_loader = data_loader
+        self.report_date = datetime.strptime(report_date, "%Y-%m-%d")
+        self.days = days
+        self.concurrency = concurrency
+        self.answers: Dict[Tuple[str, str, int], PrecomputedAnswer] = {}
+        self.state = "idle"
+        self.total = 0
+        self.done = 0
+        self.data_version: Optional[int] = None
+        self.started_at: Optional[float] = None
+        self.elapsed_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def prompts(self) -> List[str]:
+        return [prompt["prompt"] for prompt in DEMO_PROMPTS.values()] + list(QUICK_QUERIES)
+
+    def dates(self) -> List[datetime]:
+        return [self.report_date - timedelta(days=offset) for offset in range(self.days)]
+
+    def _key(self, query: str, date: datetime, version: int) -> Tuple[str, str, int]:
+        return normalize_query(query), date.strftime("%Y-%m-%d"), version
+
+    def get(self, query: str, date: datetime) -> Optional[PrecomputedAnswer]:
+        return self.answers.get(self._key(query, date, self.data_loader.version))
+
+    async def _precompute(self, semaphore: asyncio.Semaphore, query: str, date: datetime, version: int):
+        async with semaphore:
+            response, mode = await self.chatbot.answer(query, date)
+        # A fallback caused by a failing LLM is not stored; live requests will retry the LLM
+        if mode == "openai" or self.chatbot.client is None:
+            self.answers[self._key(query, date, version)] = PrecomputedAnswer(response, mode)
+        self.done += 1
+
+    async def run(self):
+        version = self.data_loader.version
+        jobs = [(query, date) for date in self.dates() for query in self.prompts()]
+        self.state = "running"
+        self.total = len(jobs)
+        self.done = 0
+        self.error = None
+        self.data_version = version
+        self.started_at = time.perf_counter()
+        # Answers for older data versions can no longer be served
+        self.answers = {key: answer for key, answer in self.answers.items() if key[2] == version}
+        try:
+            with self.data_loader.pinned():
+                semaphore = asyncio.Semaphore(self.concurrency)
+                await asyncio.gather(*(self._precompute(semaphore, query, date, version) for query, date in jobs))
+            self.state = "ready"
+        except asyncio.CancelledError:
+            self.state = "cancelled"
+            raise
+        except Exception as e:
+            print(f"[!] Answer precompute failed: {e}")
+            self.state = "failed"
+            self.error = str(e)
+        finally:
+            self.elapsed_ms = round((time.perf_counter() - self.started_at) * 1000, 1)
+
+    def start(self):
+        """(Re)start the background run on the latest snapshot; a run for older data is cancelled first."""
+        self.cancel()
+        self._task = asyncio.create_task(self.run())
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def status(self) -> Dict:
+        elapsed_ms = self.elapsed_ms
+        if self.state == "running":
+            elapsed_ms = round((time.perf_counter() - self.started_at) * 1000, 1)
+        return {
+            "state": self.state,
+            "answers_done": self.done,
+            "answers_total": self.total,
+            "data_version": self.data_version,
+            "elapsed_ms": elapsed_ms,
+            "error": self.error,
+        }
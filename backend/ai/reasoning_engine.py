@@ -1,155 +1,304 @@
+import functools
+from collections import Counter
 import pandas as pd
 import numpy as np
-from typing import Dict
+from typing import Any, Callable, Dict
 from datetime import datetime
 
+from backend.core.cache import LRUCache
 from backend.core.calculations import MetricsCalculator, AnomalyDetector
 from backend.ai.prompts import INSIGHT_TEMPLATES, DATA_CONTEXT
+from backend.ai.root_cause import build_driver_panels, root_cause_analysis
 
 
-class OperationsReasoningEngine:
-    def __init__(self, data_loader):
-        self.data_loader = data_loader
-        self.calculator = MetricsCalculator()
-        self.anomaly_detector = AnomalyDetector()
-
-    def analyze_queue_compliance(self, date: datetime) -> Dict:
-        queue_data = self.data_loader.load_queue_data()
-        zone_compliance = queue_data["zone_compliance"]
-
-        date_data = zone_compliance[zone_compliance["date"] == pd.to_datetime(date)]
-
-        zone_performance = (
-            date_data.groupby("zone")
-            .agg({"actual_compliance_pct": "mean", "variance_from_target": "mean", "pax_total": "sum"})
-            .reset_index()
-        )
-        zone_performance = zone_performance.sort_values("actual_compliance_pct")
+class FrozenDict(dict):
+    """A dict that refuses mutation; cached analyses are shared by every caller."""
 
-        anomalies = self.anomaly_detector.detect_queue_anomalies(date_data)
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("cached analysis results are read-only")
 
-        return {
-            "overall_compliance": float(date_data["actual_compliance_pct"].mean()),
-            "target": 95.0,
-            "zones_below_target": int(len(zone_performance[zone_performance["actual_compliance_pct"] < 95])),
-            "worst_zones": zone_performance.head(3).to_dict("records"),
-            "worst_time_windows": date_data[date_data["actual_compliance_pct"] < 90]
-            .sort_values("actual_compliance_pct")
-            .head(5)
-            .to_dict("records"),
-            "anomalies": anomalies.to_dict("records") if len(anomalies) > 0 else [],
-            "total_pax_affected": int(date_data[date_data["actual_compliance_pct"] < 95]["pax_total"].sum()),
-        }
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
 
-    def analyze_security_lanes(self, date: datetime) -> Dict:
-        security_data = self.data_loader.load_security_data()
-        daily_lanes = security_data["daily"]
 
-        date_data = daily_lanes[daily_lanes["date"] == pd.to_datetime(date)]
-        ranked_lanes = date_data.sort_values("cleared_volume", ascending=False)
-        anomalies = self.anomaly_detector.detect_security_lane_anomalies(date_data)
-        high_reject = date_data[date_data["reject_rate_pct"] > 8.0].sort_values("reject_rate_pct", ascending=False)
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
 
-        return {
-            "total_cleared": int(date_data["cleared_volume"].sum()),
-            "avg_reject_rate": round(float(date_data["reject_rate_pct"].mean()), 2),
-            "top_performing_lanes": ranked_lanes.head(5).to_dict("records"),
-            "high_reject_lanes": high_reject.to_dict("records"),
-            "anomalies": anomalies.to_dict("records") if len(anomalies) > 0 else [],
-        }
 
-    def analyze_passenger_volumes(self, date: datetime) -> Dict:
-        pax_data = self.data_loader.load_passenger_data()
-        daily_pax = pax_data["daily"]
-        hourly_showup = pax_data["hourly_showup"]
+def memoized(method: Callable) -> Callable:
+    """Cache `method` per arguments in the analysis cache of the current data version.
 
-        date_daily = daily_pax[daily_pax["date"] == pd.to_datetime(date)]
-        date_hourly = hourly_showup[hourly_showup["date"] == pd.to_datetime(date)]
+    Results are frozen (FrozenDict / tuple) before they are stored, so callers
+    share one copy that none of them can modify.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self.data_loader.derived(self._analysis_cache)
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        result = cache.get(key)
+        if result is None:
+            result = _freeze(method(self, *args, **kwargs))
+            cache.put(key, result)
+        return result
+    return wrapper
 
-        hourly_by_hour = date_hourly.groupby("hour")["volume"].sum().reset_index()
-        peak_hours = hourly_by_hour.nlargest(3, "volume")
 
-        total_pax = int(date_daily["pax_count"].sum())
-        domestic_pax = int(date_daily[date_daily["passenger_type"] == "Domestic"]["pax_count"].sum())
-        intl_pax = int(date_daily[date_daily["passenger_type"] == "International"]["pax_count"].sum())
+def _split_by_date(df: pd.DataFrame, dates: pd.DatetimeIndex) -> Dict[pd.Timestamp, pd.DataFrame]:
+    """Rows of `df` per date, with an empty frame (same columns) for dates without data."""
+    positions = df.groupby("date").indices
+    return {date: df.iloc[positions[date]] if date in positions else df.iloc[:0] for date in dates}
 
-        vs_7day = round(float(date_daily["pax_count_vs_7day_pct"].mean()), 2) if "pax_count_vs_7day_pct" in date_daily.columns else 0.0
 
-        return {
-            "total_pax": total_pax,
-            "domestic_pax": domestic_pax,
-            "international_pax": intl_pax,
-            "vs_7day_pct": vs_7day,
-            "peak_hours": peak_hours.to_dict("records"),
-            "hourly_distribution": hourly_by_hour.to_dict("records"),
-        }
+class OperationsReasoningEngine:
+    def __init__(self, data_loader, cache_size: int = 512):
+        self.data_loader = data_loader
+        self.calculator = MetricsCalculator()
+        self.anomaly_detector = AnomalyDetector()
+        self.cache_size = cache_size
 
-    def analyze_voc_sentiment(self, date: datetime) -> Dict:
-        voc_data = self.data_loader.load_voc_data()
-        feedback = voc_data["feedback"]
-        messages = voc_data["messages"]
+    def _analysis_cache(self, data_loader) -> LRUCache:
+        # Built once per data snapshot, so a reload starts from an empty cache
+        # while requests pinned to the old version keep using theirs.
+        return LRUCache(self.cache_size)
 
-        date_feedback = feedback[feedback["date"] == pd.to_datetime(date)]
-        date_messages = messages[messages["date"] == pd.to_datetime(date)]
+    def cache_stats(self) -> Dict:
+        return self.data_loader.derived(self._analysis_cache).stats()
 
-        total_complaints = int(date_feedback["complaints"].sum())
-        total_compliments = int(date_feedback["compliments"].sum())
-        ratio = round(total_compliments / total_complaints, 2) if total_complaints > 0 else 0
+    def _dates(self, start, end) -> pd.DatetimeIndex:
+        return pd.date_range(pd.Timestamp(start), pd.Timestamp(end))
 
-        negative_msgs = date_messages[date_messages["sentiment"] == "negative"]
+    def _queue_compliance_by_date(self, start, end) -> Dict[pd.Timestamp, Dict]:
+        data = self.data_loader.range("queue_zone_compliance", start, end)
+        dates = self._dates(start, end)
 
-        terminal_feedback = date_feedback.groupby("terminal").agg({"complaints": "sum", "compliments": "sum"}).reset_index()
+        zone_performance = (
+            data.groupby(["date", "zone"], observed=True)
+            .agg({"actual_compliance_pct": "mean", "variance_from_target": "mean", "pax_total": "sum"})
+            .reset_index()
+        )
+        days = _split_by_date(data, dates)
+        zones_by_day = _split_by_date(zone_performance, dates)
+        anomalies_by_day = _split_by_date(self.anomaly_detector.queue_anomaly_history(data), dates)
+
+        results = {}
+        for date in dates:
+            date_data = days[date]
+            zone_perf = zones_by_day[date].drop(columns="date").sort_values("actual_compliance_pct")
+            anomalies = anomalies_by_day[date]
+
+            results[date] = {
+                "overall_compliance": float(date_data["actual_compliance_pct"].mean()),
+                "target": 95.0,
+                "zones_below_target": int(len(zone_perf[zone_perf["actual_compliance_pct"] < 95])),
+                "worst_zones": zone_perf.head(3).to_dict("records"),
+                "worst_time_windows": date_data[date_data["actual_compliance_pct"] < 90]
+                .sort_values("actual_compliance_pct")
+                .head(5)
+                .to_dict("records"),
+                "anomalies": anomalies.to_dict("records") if len(anomalies) > 0 else [],
+                "total_pax_affected": int(date_data[date_data["actual_compliance_pct"] < 95]["pax_total"].sum()),
+            }
+        return results
+
+    def _security_lanes_by_date(self, start, end) -> Dict[pd.Timestamp, Dict]:
+        data = self.data_loader.range("security_lanes_daily", start, end)
+        dates = self._dates(start, end)
+        days = _split_by_date(data, dates)
+        anomalies_by_day = _split_by_date(self.anomaly_detector.security_lane_anomaly_history(data), dates)
+
+        results = {}
+        for date in dates:
+            date_data = days[date]
+            ranked_lanes = date_data.sort_values("cleared_volume", ascending=False)
+            anomalies = anomalies_by_day[date]
+            high_reject = date_data[date_data["reject_rate_pct"] > 8.0].sort_values("reject_rate_pct", ascending=False)
+
+            results[date] = {
+                "total_cleared": int(date_data["cleared_volume"].sum()),
+                "avg_reject_rate": round(float(date_data["reject_rate_pct"].mean()), 2),
+                "top_performing_lanes": ranked_lanes.head(5).to_dict("records"),
+                "high_reject_lanes": high_reject.to_dict("records"),
+                "anomalies": anomalies.to_dict("records") if len(anomalies) > 0 else [],
+            }
+        return results
+
+    def _passenger_volumes_by_date(self, start, end) -> Dict[pd.Timestamp, Dict]:
+        daily = self.data_loader.range("pax_daily_volumes", start, end)
+        hourly = self.data_loader.range("pax_hourly_showup", start, end)
+        dates = self._dates(start, end)
+
+        hourly_by_hour = hourly.groupby(["date", "hour"])["volume"].sum().reset_index()
+        days = _split_by_date(daily, dates)
+        hours_by_day = _split_by_date(hourly_by_hour, dates)
+        has_vs_7day = "pax_count_vs_7day_pct" in daily.columns
+
+        results = {}
+        for date in dates:
+            date_daily = days[date]
+            date_hourly = hours_by_day[date].drop(columns="date")
+            peak_hours = date_hourly.nlargest(3, "volume")
+
+            total_pax = int(date_daily["pax_count"].sum())
+            domestic_pax = int(date_daily[date_daily["passenger_type"] == "Domestic"]["pax_count"].sum())
+            intl_pax = int(date_daily[date_daily["passenger_type"] == "International"]["pax_count"].sum())
+
+            vs_7day = round(float(date_daily["pax_count_vs_7day_pct"].mean()), 2) if has_vs_7day else 0.0
+
+            results[date] = {
+                "total_pax": total_pax,
+                "domestic_pax": domestic_pax,
+                "international_pax": intl_pax,
+                "vs_7day_pct": vs_7day,
+                "peak_hours": peak_hours.to_dict("records"),
+                "hourly_distribution": date_hourly.to_dict("records"),
+            }
+        return results
+
+    def _voc_sentiment_by_date(self, start, end) -> Dict[pd.Timestamp, Dict]:
+        feedback = self.data_loader.range("voc_feedback", start, end)
+        messages = self.data_loader.range("voc_messages", start, end)
+        dates = self._dates(start, end)
+
+        terminal_feedback = feedback.groupby(["date", "terminal"], observed=True).agg({"complaints": "sum", "compliments": "sum"}).reset_index()
         terminal_feedback["ratio"] = terminal_feedback["compliments"] / terminal_feedback["complaints"].replace(0, 1)
+        days = _split_by_date(feedback, dates)
+        messages_by_day = _split_by_date(messages, dates)
+        terminals_by_day = _split_by_date(terminal_feedback, dates)
+
+        results = {}
+        for date in dates:
+            date_feedback = days[date]
+            date_messages = messages_by_day[date]
+
+            total_complaints = int(date_feedback["complaints"].sum())
+            total_compliments = int(date_feedback["compliments"].sum())
+            ratio = round(total_compliments / total_complaints, 2) if total_complaints > 0 else 0
+
+            negative_msgs = date_messages[date_messages["sentiment"] == "negative"]
+
+            results[date] = {
+                "total_complaints": total_complaints,
+                "total_compliments": total_compliments,
+                "ratio": ratio,
+                "sentiment": "Good" if ratio >= 2.0 else "Needs Attention",
+                "terminal_breakdown": terminals_by_day[date].drop(columns="date").to_dict("records"),
+                "negative_messages": negative_msgs.head(10).to_dict("records"),
+            }
+        return results
+
+    # Range variants return {date: analysis} for every date in [start, end], computed
+    # in one grouped pass per dataset; the single-date methods are views over them.
+
+    @memoized
+    def analyze_queue_compliance_range(self, start: datetime, end: datetime) -> Dict[pd.Timestamp, Dict]:
+        return self._queue_compliance_by_date(start, end)
+
+    @memoized
+    def analyze_security_lanes_range(self, start: datetime, end: datetime) -> Dict[pd.Timestamp, Dict]:
+        return self._security_lanes_by_date(start, end)
+
+    @memoized
+    def analyze_passenger_volumes_range(self, start: datetime, end: datetime) -> Dict[pd.Timestamp, Dict]:
+        return self._passenger_volumes_by_date(start, end)
+
+    @memoized
+    def analyze_voc_sentiment_range(self, start: datetime, end: datetime) -> Dict[pd.Timestamp, Dict]:
+        return self._voc_sentiment_by_date(start, end)
+
+    @memoized
+    def analyze_queue_compliance(self, date: datetime) -> Dict:
+        return self._queue_compliance_by_date(date, date)[pd.Timestamp(date)]
 
-        return {
-            "total_complaints": total_complaints,
-            "total_compliments": total_compliments,
-            "ratio": ratio,
-            "sentiment": "Good" if ratio >= 2.0 else "Needs Attention",
-            "terminal_breakdown": terminal_feedback.to_dict("records"),
-            "negative_messages": negative_msgs.head(10).to_dict("records"),
-        }
-
-    def generate_root_cause_analysis(self, date: datetime, zone: str, time_window: str) -> Dict:
-        queue_analysis = self.analyze_queue_compliance(date)
-        security_analysis = self.analyze_security_lanes(date)
-        pax_analysis = self.analyze_passenger_volumes(date)
-
-        factors = []
-
-        peak_volumes = pax_analysis["hourly_distribution"]
-        relevant_hours = [h for h in peak_volumes if 14 <= h["hour"] <= 16]
-        if relevant_hours:
-            avg_peak_vol = sum(h["volume"] for h in relevant_hours) / len(relevant_hours)
-            factors.append(f"High passenger volumes during {time_window}: ~{int(avg_peak_vol):,} pax/hour")
-
-        if security_analysis["high_reject_lanes"]:
-            high_reject_lanes = [lane["lane"] for lane in security_analysis["high_reject_lanes"][:3]]
-            factors.append(f"High reject rates at security lanes: {', '.join(high_reject_lanes)}")
+    @memoized
+    def analyze_security_lanes(self, date: datetime) -> Dict:
+        return self._security_lanes_by_date(date, date)[pd.Timestamp(date)]
 
-        worst_zones = [z["zone"] for z in queue_analysis["worst_zones"]]
-        if zone in worst_zones:
-            factors.append(f"Check-in processing delays at {zone}")
+    @memoized
+    def analyze_passenger_volumes(self, date: datetime) -> Dict:
+        return self._passenger_volumes_by_date(date, date)[pd.Timestamp(date)]
 
-        recommendations = [
-            "Open additional security lanes (minimum 2) during 1400-1800 window",
-            "Assign senior screeners to lanes with high reject rates (L6, L3)",
-            "Implement queue marshaling at T2 check-in banks during peak hours",
-            "Promote biometric fast-track lanes via digital signage",
-        ]
+    @memoized
+    def analyze_voc_sentiment(self, date: datetime) -> Dict:
+        return self._voc_sentiment_by_date(date, date)[pd.Timestamp(date)]
 
-        worst_compliance = queue_analysis["worst_zones"][0]["actual_compliance_pct"] if queue_analysis["worst_zones"] else 0
+    @memoized
+    def generate_root_cause_analysis(self, date: datetime, zone: str, time_window: str) -> Dict:
+        """Rank the drivers of queue compliance at `zone` during `time_window` on `date`.
+
+        Show-ups and security lane reject rate and throughput for the zone's terminal
+        are each scored against their own recent baseline; other zones of the terminal
+        whose compliance also dropped are listed as co-occurring, not as drivers.
+        Raises ValueError for a zone with no queue data in the baseline window.
+        """
+        # Each date's panel covers only the days its baselines look back over
+        panel = self.data_loader.derived(build_driver_panels).for_date(date)
+        return root_cause_analysis(panel, date, zone, time_window)
+
+    @memoized
+    def generate_period_summary(self, start: datetime, end: datetime) -> Dict:
+        """Executive roll-up of every date with data in [start, end]."""
+        queue = self.analyze_queue_compliance_range(start, end)
+        security = self.analyze_security_lanes_range(start, end)
+        pax = self.analyze_passenger_volumes_range(start, end)
+        voc = self.analyze_voc_sentiment_range(start, end)
+
+        daily = []
+        problem_zones = Counter()
+        for date in self._dates(start, end):
+            if np.isnan(queue[date]["overall_compliance"]):
+                continue
+            daily.append({
+                "date": date.strftime("%Y-%m-%d"),
+                "total_pax": pax[date]["total_pax"],
+                "queue_compliance": round(queue[date]["overall_compliance"], 1),
+                "zones_below_target": queue[date]["zones_below_target"],
+                "avg_reject_rate": security[date]["avg_reject_rate"],
+                "voc_ratio": voc[date]["ratio"],
+            })
+            problem_zones.update(z["zone"] for z in queue[date]["worst_zones"] if z["actual_compliance_pct"] < 95)
+
+        if not daily:
+            return {"start": start.strftime("%Y-%m-%d"), "end": end.strftime("%Y-%m-%d"), "days": 0, "daily": []}
+
+        avg_compliance = float(np.mean([queue[pd.Timestamp(d["date"])]["overall_compliance"] for d in daily]))
+        worst_day = min(daily, key=lambda d: d["queue_compliance"])
+        total_complaints = sum(v["total_complaints"] for v in voc.values())
+        total_compliments = sum(v["total_compliments"] for v in voc.values())
+        total_pax = sum(d["total_pax"] for d in daily)
+
+        if avg_compliance >= 95:
+            status, status_label = "on_track", "On Track"
+        elif avg_compliance >= 90:
+            status, status_label = "attention", "Attention Needed"
+        else:
+            status, status_label = "critical", "Action Required"
 
         return {
-            "zone": zone,
-            "time_window": time_window,
-            "primary_issue": f"Queue compliance dropped to {worst_compliance:.1f}% (Target: 95%)",
-            "factors": factors,
-            "impact": f"{queue_analysis['total_pax_affected']:,} passengers experienced extended wait times",
-            "recommendations": recommendations,
-            "severity": "High" if queue_analysis["overall_compliance"] < 90 else "Medium",
+            "start": start.strftime("%Y-%m-%d"),
+            "end": end.strftime("%Y-%m-%d"),
+            "days": len(daily),
+            "status": status,
+            "status_label": status_label,
+            "total_pax": total_pax,
+            "avg_daily_pax": int(round(total_pax / len(daily))),
+            "domestic_pax": sum(p["domestic_pax"] for p in pax.values()),
+            "international_pax": sum(p["international_pax"] for p in pax.values()),
+            "avg_queue_compliance": round(avg_compliance, 1),
+            "days_below_target": sum(1 for d in daily if d["queue_compliance"] < 95),
+            "worst_day": {"date": worst_day["date"], "queue_compliance": worst_day["queue_compliance"]},
+            "recurring_problem_zones": [{"zone": zone, "days": n} for zone, n in problem_zones.most_common(3)],
+            "avg_reject_rate": round(float(np.mean([d["avg_reject_rate"] for d in daily])), 2),
+            "total_complaints": total_complaints,
+            "total_compliments": total_compliments,
+            "voc_ratio": round(total_compliments / total_complaints, 2) if total_complaints > 0 else 0,
+            "daily": daily,
         }
 
+    @memoized
     def generate_executive_summary(self, date: datetime) -> str:
         queue = self.analyze_queue_compliance(date)
         security = self.analyze_security_lanes(date)
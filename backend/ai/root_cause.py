@@ -0,0 +1,316 @@
+import re
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from backend.core.cache import LRUCache
+
+
+TARGET_COMPLIANCE = 95.0
+
+# Prior days each series is compared against, and how many of them it needs
+BASELINE_DAYS = 28
+MIN_BASELINE_DAYS = 3
+
+# Drivers scoring below this many standard deviations are not reported
+MIN_SCORE = 1.0
+MAX_FACTORS = 5
+
+# source -> (label, unit, direction); direction is +1 when a rise builds queues, -1 when a drop does.
+# Queue compliance is the symptom: other zones' compliance is reported as co-occurring, never as a driver.
+DRIVERS = {
+    "demand": ("Passenger show-ups", "pax/hour", 1.0),
+    "screening_rejects": ("Security reject rate", "%", 1.0),
+    "lane_throughput": ("Security lane throughput", "pax/hour", -1.0),
+    "queue_compliance": ("Queue compliance", "%", -1.0),
+}
+
+
+def parse_time_window(time_window: str) -> Tuple[int, int]:
+    """'1400-1600' -> (14, 16): the hours [14, 16) the window covers.
+
+    Observations are hourly, so both ends must be whole hours (minutes 00).
+    """
+    match = re.fullmatch(r"(\d{2})00-(\d{2})00", time_window)
+    if match is None:
+        raise ValueError(f"Invalid time window '{time_window}', expected whole hours as HH00-HH00")
+    start, end = int(match.group(1)), int(match.group(2))
+    if not (0 <= start < 24 and 0 < end <= 24) or start == end:
+        raise ValueError(f"Invalid time window '{time_window}', expected whole hours as HH00-HH00")
+    return start, end
+
+
+def _hours_mask(hours: np.ndarray, start: int, end: int) -> np.ndarray:
+    if start < end:
+        return (hours >= start) & (hours < end)
+    # Windows past midnight, e.g. 2300-0100
+    return (hours >= start) | (hours < end)
+
+
+def _days(dates: pd.Series) -> np.ndarray:
+    return dates.to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+
+def _observations(source: str, entity: pd.Series, terminal: pd.Series, dates: pd.Series,
+                  hours, numerator, denominator) -> pd.DataFrame:
+    return pd.DataFrame({
+        "source": source,
+        "entity": entity.astype(str).to_numpy(),
+        "terminal": terminal.astype(str).to_numpy(),
+        "day": _days(dates),
+        "hour": np.asarray(hours, dtype=np.int64),
+        "numerator": np.asarray(numerator, dtype=np.float64),
+        "denominator": np.asarray(denominator, dtype=np.float64),
+    })
+
+
+def _queue_observations(hourly: pd.DataFrame, windows: pd.DataFrame) -> pd.DataFrame:
+    parts = [_observations(
+        "queue_compliance", hourly["zone"], hourly["terminal"], hourly["date"], hourly["hour"],
+        hourly["pax_meeting_threshold"] * 100.0, hourly["pax_total"],
+    )]
+
+    # Zones only reported per two-hour window are spread evenly over the window's hours
+    windows = windows[~windows["zone"].astype(str).isin(set(hourly["zone"].astype(str)))]
+    if len(windows):
+        bounds = {w: parse_time_window(w) for w in windows["time_window"].astype(str).unique()}
+        start = windows["time_window"].astype(str).map(lambda w: bounds[w][0]).to_numpy()
+        span = windows["time_window"].astype(str).map(lambda w: (bounds[w][1] - bounds[w][0]) % 24).to_numpy()
+        rows = np.repeat(np.arange(len(windows)), span)
+        offset = np.arange(len(rows)) - np.repeat(np.cumsum(span) - span, span)
+        expanded = windows.iloc[rows]
+        parts.append(_observations(
+            "queue_compliance", expanded["zone"], expanded["terminal"], expanded["date"], (start[rows] + offset) % 24,
+            expanded["pax_meeting_threshold"].to_numpy() * 100.0 / span[rows],
+            expanded["pax_total"].to_numpy() / span[rows],
+        ))
+    return pd.concat(parts, ignore_index=True)
+
+
+class DriverPanel:
+    """Every hourly observation a root cause can draw on, as parallel numpy arrays sorted by day.
+
+    An observation belongs to one series (source, entity) and carries a numerator
+    and denominator, so any set of hours aggregates to a ratio: show-ups and
+    throughput per hour, reject rate and compliance in percent.
+    """
+
+    def __init__(self, observations: pd.DataFrame):
+        observations = observations.sort_values("day", kind="stable")
+        codes, series = pd.MultiIndex.from_arrays([observations["source"], observations["entity"]]).factorize()
+        terminals = observations.groupby(codes, sort=True)["terminal"].first()
+        self.series = pd.DataFrame({
+            "source": series.get_level_values(0),
+            "entity": series.get_level_values(1),
+            "terminal": terminals.to_numpy(),
+        })
+        self.terminal_codes, self.terminals = pd.factorize(self.series["terminal"])
+        self.sign = self.series["source"].map(lambda source: DRIVERS[source][2]).to_numpy(dtype=np.float64)
+
+        self.series_id = codes.astype(np.int64)
+        self.day = observations["day"].to_numpy()
+        self.hour = observations["hour"].to_numpy()
+        self.numerator = observations["numerator"].to_numpy()
+        self.denominator = observations["denominator"].to_numpy()
+
+    def terminal_of(self, source: str, entity: str) -> Optional[str]:
+        match = self.series[(self.series["source"] == source) & (self.series["entity"] == entity)]
+        return match["terminal"].iloc[0] if len(match) else None
+
+    def attribute(self, date, start_hour: int, end_hour: int, terminal: Optional[str] = None,
+                  baseline_days: int = BASELINE_DAYS) -> pd.DataFrame:
+        """Each series' value over the window on `date` against its mean over the prior days.
+
+        One pass over the panel rows in [date - baseline_days, date]: window hours are
+        summed per (series, day) with bincount, then reduced to a baseline per series.
+        Every series observed on `date` is returned; `baseline_days` says how many
+        prior days its baseline rests on, so callers decide what is comparable.
+        """
+        today = int(pd.Timestamp(date).to_datetime64().astype("datetime64[D]").astype(np.int64))
+        first = today - baseline_days
+        lo, hi = np.searchsorted(self.day, [first, today + 1])
+
+        series_id = self.series_id[lo:hi]
+        mask = _hours_mask(self.hour[lo:hi], start_hour, end_hour)
+        if terminal is not None:
+            code = self.terminals.get_loc(terminal) if terminal in self.terminals else -1
+            mask &= self.terminal_codes[series_id] == code
+
+        n_days = baseline_days + 1
+        slot = series_id[mask] * n_days + (self.day[lo:hi][mask] - first)
+        size = len(self.series) * n_days
+        numerator = np.bincount(slot, self.numerator[lo:hi][mask], minlength=size).reshape(-1, n_days)
+        denominator = np.bincount(slot, self.denominator[lo:hi][mask], minlength=size).reshape(-1, n_days)
+
+        observed = denominator > 0
+        value = np.divide(numerator, denominator, out=np.full(numerator.shape, np.nan), where=observed)
+        history, history_observed = value[:, :-1], observed[:, :-1]
+        n = history_observed.sum(axis=1)
+        baseline = np.where(history_observed, history, 0.0).sum(axis=1) / np.maximum(n, 1)
+        variance = np.where(history_observed, (history - baseline[:, None]) ** 2, 0.0).sum(axis=1) / np.maximum(n - 1, 1)
+        # Floor the spread at 1% of the level so flat series do not turn noise into drivers
+        std = np.maximum(np.sqrt(variance), np.maximum(0.01 * np.abs(baseline), 1e-9))
+
+        current = value[:, -1]
+        z = (current - baseline) / std
+        result = self.series.assign(
+            value=current,
+            baseline=baseline,
+            baseline_days=n,
+            z=z,
+            score=self.sign * z,
+            numerator=numerator[:, -1],
+            denominator=denominator[:, -1],
+        )
+        return result[observed[:, -1]]
+
+
+def build_driver_panel(dl, start, end) -> DriverPanel:
+    """Panel of the observations dated start..end, read with only the columns drivers use."""
+    showup = dl.range("pax_hourly_showup", start, end, ["date", "hour", "terminal", "passenger_type", "volume"])
+    lanes = dl.range("security_lanes_hourly", start, end, ["date", "hour", "terminal", "lane", "cleared_volume", "reject_count"])
+    hourly = dl.range("queue_hourly_compliance", start, end, ["date", "hour", "terminal", "zone", "pax_total", "pax_meeting_threshold"])
+    windows = dl.range("queue_zone_compliance", start, end, ["date", "terminal", "zone", "time_window", "pax_total", "pax_meeting_threshold"])
+    observations = pd.concat([
+        _observations(
+            "demand", showup["terminal"].astype(str) + " " + showup["passenger_type"].astype(str),
+            showup["terminal"], showup["date"], showup["hour"], showup["volume"], np.ones(len(showup)),
+        ),
+        _observations(
+            "screening_rejects", lanes["lane"], lanes["terminal"], lanes["date"], lanes["hour"],
+            lanes["reject_count"] * 100.0, lanes["cleared_volume"] + lanes["reject_count"],
+        ),
+        _observations(
+            "lane_throughput", lanes["lane"], lanes["terminal"], lanes["date"], lanes["hour"],
+            lanes["cleared_volume"], np.ones(len(lanes)),
+        ),
+        _queue_observations(hourly, windows),
+    ], ignore_index=True)
+    return DriverPanel(observations)
+
+
+class DriverPanels:
+    """Driver panels for one data version, one per analysed date, each read over its baseline window."""
+
+    def __init__(self, dl, cache_size: int = 16, baseline_days: int = BASELINE_DAYS):
+        self.dl = dl
+        self.baseline_days = baseline_days
+        self.panels = LRUCache(cache_size)
+
+    def for_date(self, date) -> DriverPanel:
+        date = pd.Timestamp(date)
+        panel = self.panels.get(date)
+        if panel is None:
+            panel = build_driver_panel(self.dl, date - pd.Timedelta(days=self.baseline_days), date)
+            self.panels.put(date, panel)
+        return panel
+
+
+def build_driver_panels(dl) -> DriverPanels:
+    return DriverPanels(dl)
+
+
+def _format(value: float, unit: str) -> str:
+    return f"{value:.1f}%" if unit == "%" else f"{value:,.0f} {unit}"
+
+
+def _deviating(scored: pd.DataFrame) -> pd.DataFrame:
+    """The series furthest from a baseline of enough days, strongest first."""
+    rows = scored[(scored["baseline_days"] >= MIN_BASELINE_DAYS) & (scored["score"] >= MIN_SCORE)]
+    rows = rows.sort_values("score", ascending=False, kind="stable").head(MAX_FACTORS)
+    return rows.assign(change_pct=(rows["value"] / rows["baseline"] - 1) * 100)
+
+
+def _factor(row) -> str:
+    label, unit, _ = DRIVERS[row.source]
+    return (
+        f"{label} at {row.entity}: {_format(row.value, unit)} vs {_format(row.baseline, unit)} "
+        f"{row.baseline_days}-day baseline ({row.change_pct:+.0f}%)"
+    )
+
+
+def _evidence(rows: pd.DataFrame) -> List[Dict]:
+    evidence = []
+    for rank, row in enumerate(rows.itertuples(index=False), start=1):
+        label, unit, _ = DRIVERS[row.source]
+        evidence.append({
+            "rank": rank,
+            "source": row.source,
+            "factor": label,
+            "entity": row.entity,
+            "unit": unit,
+            "value": round(float(row.value), 2),
+            "baseline": round(float(row.baseline), 2),
+            "change_pct": round(float(row.change_pct), 1),
+            "z_score": round(float(row.z), 2),
+            "baseline_days": int(row.baseline_days),
+        })
+    return evidence
+
+
+def _recommendations(drivers: pd.DataFrame, co_occurring: pd.DataFrame, zone: str, time_window: str) -> List[str]:
+    def entities(source: str) -> str:
+        return ", ".join(drivers.loc[drivers["source"] == source, "entity"].head(3))
+
+    recommendations = []
+    sources = list(dict.fromkeys(drivers["source"]))
+    for source in sources:
+        if source == "demand":
+            change = drivers.loc[drivers["source"] == "demand", "change_pct"].max()
+            recommendations.append(f"Open additional security lanes during {time_window}: {entities(source)} demand is {change:+.0f}% over baseline")
+            recommendations.append("Promote biometric fast-track lanes via digital signage")
+        elif source == "screening_rejects":
+            recommendations.append(f"Assign senior screeners to lanes with high reject rates ({entities(source)}) during {time_window}")
+        elif source == "lane_throughput":
+            recommendations.append(f"Check staffing and equipment on {entities(source)}; throughput is below its usual {time_window} level")
+    if len(co_occurring):
+        zones = ", ".join(co_occurring["entity"].head(3))
+        recommendations.append(f"Implement queue marshaling at {zone} and {zones}, which are also below their usual {time_window} compliance")
+    if not recommendations:
+        recommendations.append(f"No driver deviates from its baseline; review the staffing roster at {zone} for {time_window}")
+    return recommendations
+
+
+def root_cause_analysis(panel: DriverPanel, date, zone: str, time_window: str,
+                        baseline_days: int = BASELINE_DAYS) -> Dict:
+    start, end = parse_time_window(time_window)
+    terminal = panel.terminal_of("queue_compliance", zone)
+    if terminal is None:
+        raise ValueError(
+            f"Unknown zone '{zone}': no queue compliance recorded in the {baseline_days} days up to {pd.Timestamp(date):%Y-%m-%d}"
+        )
+    scored = panel.attribute(date, start, end, terminal, baseline_days)
+
+    # The zone's own compliance is reported even without enough history for a baseline
+    queues = scored["source"] == "queue_compliance"
+    symptom = scored[queues & (scored["entity"] == zone)]
+    drivers = _deviating(scored[~queues])
+    co_occurring = _deviating(scored[queues & (scored["entity"] != zone)])
+
+    factors = [_factor(row) for row in drivers.itertuples(index=False)]
+
+    if len(symptom):
+        compliance = float(symptom["value"].iloc[0])
+        pax_total = float(symptom["denominator"].iloc[0])
+        pax_affected = int(round(pax_total - float(symptom["numerator"].iloc[0]) / 100))
+        primary_issue = f"Queue compliance at {zone} during {time_window} was {compliance:.1f}% (Target: {TARGET_COMPLIANCE:.0f}%)"
+        impact = f"{pax_affected:,} passengers experienced extended wait times"
+        severity = "High" if compliance < 90 else "Medium" if compliance < TARGET_COMPLIANCE else "Low"
+    else:
+        compliance = None
+        primary_issue = f"No queue data for {zone} during {time_window}"
+        impact = "No passengers recorded in this window"
+        severity = "Low"
+
+    return {
+        "zone": zone,
+        "time_window": time_window,
+        "primary_issue": primary_issue,
+        "compliance": round(compliance, 1) if compliance is not None else None,
+        "factors": factors,
+        "drivers": _evidence(drivers),
+        "co_occurring": _evidence(co_occurring),
+        "impact": impact,
+        "recommendations": _recommendations(drivers, co_occurring, zone, time_window),
+        "severity": severity,
+    }
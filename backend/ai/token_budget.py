@@ -0,0 +1,194 @@
+import hashlib
+import re
+from typing import Dict, List, Optional
+
+from backend.core.cache import LRUCache
+
+# Words, runs of digits and single punctuation marks, roughly how BPE tokenizers split text
+_PIECES = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+
+# Chat formatting overhead: per message, and once for priming the reply
+MESSAGE_TOKENS = 4
+REPLY_TOKENS = 3
+
+# Characters of an earlier question kept in the conversation summary
+SUMMARY_QUESTION_CHARS = 120
+
+# Appended to a question cut down to the budget
+TRUNCATION_MARK = "..."
+
+# Counts by digest of the text, so memoizing a long message does not keep the message alive
+_COUNTS = LRUCache(4096)
+
+
+def _piece_tokens(piece: str) -> int:
+    if piece[0].isdigit():
+        return (len(piece) + 2) // 3
+    return (len(piece) + 3) // 4
+
+
+def count_tokens(text: str) -> int:
+    """Approximate BPE token count without a model vocabulary.
+
+    Words cost one token per four letters (common English words are a single
+    token), digits are split in groups of three and punctuation is a token each.
+    Conversation turns are resent with every question, so counts are memoized.
+    """
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    tokens = _COUNTS.get(key)
+    if tokens is None:
+        tokens = sum(_piece_tokens(piece) for piece in _PIECES.findall(text))
+        _COUNTS.put(key, tokens)
+    return tokens
+
+
+def truncate_tokens(text: str, limit: int) -> str:
+    """`text` cut at a piece boundary and marked, so that it counts at most `limit` tokens."""
+    if count_tokens(text) <= limit:
+        return text
+    budget, tokens = limit - count_tokens(TRUNCATION_MARK), 0
+    for match in _PIECES.finditer(text):
+        tokens += _piece_tokens(match.group())
+        if tokens > budget:
+            return text[:match.start()].rstrip() + TRUNCATION_MARK
+    return text
+
+
+def message_tokens(message: Dict) -> int:
+    return MESSAGE_TOKENS + count_tokens(str(message.get("content", "")))
+
+
+def _summary_message(questions: List[str]) -> Dict:
+    return {"role": "system", "content": "Earlier in this conversation the user asked: " + "; ".join(f'"{q}"' for q in questions)}
+
+
+class BudgetedPrompt:
+    """Messages for one LLM call, the conversation part of them and the per-part token counts."""
+
+    def __init__(self, messages: List[Dict], history: List[Dict], usage: Dict):
+        self.messages = messages
+        self.history = history
+        self.usage = usage
+
+
+class PromptBudget:
+    """Fills a prompt up to `max_tokens` in priority order.
+
+    The system prompt and the question are always sent; a question longer than
+    `query_tokens` (or than what the system prompt leaves) is cut to fit. Context
+    blocks follow in relevance order, then conversation turns from the newest back
+    (at most `max_turns`). When not every turn can be sent, `summary_tokens` are
+    set aside first for a summary of the user's earlier questions, and the recent
+    turns fill the rest; whatever fits in neither is dropped.
+    """
+
+    def __init__(self, max_tokens: int = 3000, summary_tokens: int = 150, max_turns: int = 10, query_tokens: int = 500):
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.max_turns = max_turns
+        self.query_tokens = query_tokens
+
+    def _summary(self, turns: List[Dict], budget: int) -> List[str]:
+        """The user's questions among `turns`, newest first back, as many as fit in `budget`."""
+        questions = []
+        for turn in reversed(turns):
+            if turn.get("role") != "user":
+                continue
+            question = " ".join(str(turn.get("content", "")).split())
+            if len(question) > SUMMARY_QUESTION_CHARS:
+                question = question[:SUMMARY_QUESTION_CHARS].rsplit(" ", 1)[0] + "..."
+            if message_tokens(_summary_message([question, *questions])) > budget:
+                break
+            questions.insert(0, question)
+        return questions
+
+    def assemble(self, system: str, context: List[str], history: Optional[List[Dict]], query: str) -> BudgetedPrompt:
+        system_message = {"role": "system", "content": system}
+        system_tokens = message_tokens(system_message)
+        query_limit = min(self.query_tokens, self.max_tokens - REPLY_TOKENS - system_tokens - MESSAGE_TOKENS)
+        sent_query = truncate_tokens(query, max(query_limit, 0))
+        query_message = {"role": "user", "content": sent_query}
+        query_tokens = message_tokens(query_message)
+        remaining = self.max_tokens - REPLY_TOKENS - system_tokens - query_tokens
+
+        # Blocks are joined into one system message, so only the first carries the message overhead
+        kept, context_tokens, blocks_dropped = [], 0, 0
+        for block in context:
+            cost = count_tokens(block) + (1 if kept else MESSAGE_TOKENS)
+            if cost <= remaining - context_tokens:
+                kept.append(block)
+                context_tokens += cost
+            else:
+                blocks_dropped += 1
+        remaining -= context_tokens
+
+        turns = list(history or [])
+        costs = [message_tokens(turn) for turn in turns[::-1][:self.max_turns]]
+        # Room for the summary is set aside only when some turns will have to go into it
+        room = remaining
+        if len(turns) > len(costs) or sum(costs) > remaining:
+            room -= min(self.summary_tokens, remaining)
+        recent, history_tokens = 0, 0
+        for cost in costs:
+            if history_tokens + cost > room:
+                break
+            history_tokens += cost
+            recent += 1
+        # Older turns get the reserved room plus whatever the recent ones left
+        older = turns[:len(turns) - recent]
+        questions = self._summary(older, min(self.summary_tokens, remaining - history_tokens))
+        summary = _summary_message(questions) if questions else None
+        summary_tokens = message_tokens(summary) if summary is not None else 0
+
+        sent_history = ([summary] if summary is not None else []) + turns[len(turns) - recent:]
+        messages = [system_message]
+        if kept:
+            messages.append({"role": "system", "content": "\n".join(kept)})
+        messages.extend(sent_history)
+        messages.append(query_message)
+
+        usage = {
+            "budget": self.max_tokens,
+            "system": system_tokens,
+            "context": context_tokens,
+            "summary": summary_tokens,
+            "history": history_tokens,
+            "query": query_tokens,
+            "query_truncated": sent_query != query,
+            "prompt": REPLY_TOKENS + system_tokens + context_tokens + summary_tokens + history_tokens + query_tokens,
+            "blocks_sent": len(kept),
+            "blocks_dropped": blocks_dropped,
+            "turns_sent": recent,
+            "turns_summarized": len(questions),
+            "turns_dropped": len(older) - len(questions),
+        }
+        return BudgetedPrompt(messages, sent_history, usage)
+
+
+class TokenStats:
+    """Running totals of the prompt and completion tokens of chat requests."""
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.max_prompt_tokens = 0
+        self.trimmed = 0
+
+    def record(self, usage: Dict):
+        self.requests += 1
+        self.prompt_tokens += usage["prompt"]
+        self.completion_tokens += usage.get("completion", 0)
+        self.max_prompt_tokens = max(self.max_prompt_tokens, usage["prompt"])
+        if usage["query_truncated"] or usage["blocks_dropped"] or usage["turns_summarized"] or usage["turns_dropped"]:
+            self.trimmed += 1
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "avg_prompt_tokens": round(self.prompt_tokens / self.requests, 1) if self.requests else None,
+            "max_prompt_tokens": self.max_prompt_tokens,
+            "trimmed_requests": self.trimmed,
+        }
@@ -0,0 +1,284 @@
+import copy
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from backend.core.config import CONFIG
+
+
+# z-score at which an observation is flagged, by dashboard.anomaly_detection.sensitivity
+SENSITIVITY_THRESHOLDS = {"low": 3.5, "medium": 3.0, "high": 2.5}
+
+# Days read from disk per ingest step, so lazy datasets are never read whole
+INGEST_DAYS = 31
+
+
+class StreamingStats:
+    """Running statistics for many series at once, updated in O(1) per observation.
+
+    For every series it keeps a ring buffer of the last `window` values (rolling
+    mean and variance from running sums), an EWMA mean and variance, and an EWMA
+    mean per day of week. All state lives in numpy arrays indexed by series id, so one
+    batch of observations (one per series) is a handful of vectorized operations.
+    """
+
+    def __init__(self, window: int = 14, alpha: float = 0.2, min_observations: int = 7,
+                 min_seasonal_observations: int = 3, min_std: float = 0.5, capacity: int = 64):
+        self.window = window
+        self.alpha = alpha
+        self.min_observations = min_observations
+        self.min_seasonal_observations = min_seasonal_observations
+        # Floor for the standard deviation so near-constant series do not flag noise
+        self.min_std = min_std
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        def grow(old: Optional[np.ndarray], shape: Tuple[int, ...], dtype) -> np.ndarray:
+            new = np.zeros(shape, dtype=dtype)
+            if old is not None:
+                new[:len(old)] = old
+            return new
+
+        self.capacity = capacity
+        self.count = grow(getattr(self, "count", None), (capacity,), np.int64)
+        self.buffer = grow(getattr(self, "buffer", None), (capacity, self.window), np.float64)
+        self.roll_sum = grow(getattr(self, "roll_sum", None), (capacity,), np.float64)
+        self.roll_sumsq = grow(getattr(self, "roll_sumsq", None), (capacity,), np.float64)
+        self.ew_mean = grow(getattr(self, "ew_mean", None), (capacity,), np.float64)
+        self.ew_var = grow(getattr(self, "ew_var", None), (capacity,), np.float64)
+        self.season_count = grow(getattr(self, "season_count", None), (capacity, 7), np.int64)
+        self.season_mean = grow(getattr(self, "season_mean", None), (capacity, 7), np.float64)
+
+    def reserve(self, size: int):
+        if size > self.capacity:
+            self._allocate(max(size, self.capacity * 2))
+
+    def _z(self, x: np.ndarray, mean: np.ndarray, var: np.ndarray, ready: np.ndarray) -> np.ndarray:
+        std = np.maximum(np.sqrt(np.maximum(var, 0.0)), self.min_std)
+        return np.where(ready, (x - mean) / std, np.nan)
+
+    def update(self, ids: np.ndarray, x: np.ndarray, weekday: int) -> Dict[str, np.ndarray]:
+        """Score `x` against each series' state, then fold it in. `ids` must be unique."""
+        n = self.count[ids]
+
+        # Scores use the state before this observation
+        k = np.minimum(n, self.window)
+        kk = np.maximum(k, 1)
+        roll_mean = self.roll_sum[ids] / kk
+        roll_var = self.roll_sumsq[ids] / kk - roll_mean ** 2
+        ew_mean = self.ew_mean[ids]
+        ew_var = self.ew_var[ids]
+        s_n = self.season_count[ids, weekday]
+        s_mean = self.season_mean[ids, weekday]
+        scores = {
+            "expected": np.where(n > 0, ew_mean, np.nan),
+            "z_rolling": self._z(x, roll_mean, roll_var, k >= self.min_observations),
+            "z_ewma": self._z(x, ew_mean, ew_var, n >= self.min_observations),
+            # A weekday sees few observations, so its baseline sets the level only and
+            # the dispersion comes from the series as a whole
+            "z_seasonal": self._z(x, s_mean, ew_var, (s_n >= self.min_seasonal_observations) & (n >= self.min_observations)),
+        }
+
+        # Rolling window: replace the oldest value in the ring buffer
+        pos = n % self.window
+        full = n >= self.window
+        old = self.buffer[ids, pos]
+        self.roll_sum[ids] += x - np.where(full, old, 0.0)
+        self.roll_sumsq[ids] += x * x - np.where(full, old * old, 0.0)
+        self.buffer[ids, pos] = x
+        # Re-sum once per lap so floating-point drift never accumulates
+        lap = ids[pos == self.window - 1]
+        self.roll_sum[lap] = self.buffer[lap].sum(axis=1)
+        self.roll_sumsq[lap] = (self.buffer[lap] ** 2).sum(axis=1)
+
+        self.ew_mean[ids], self.ew_var[ids] = self._ewma(x, ew_mean, ew_var, n == 0)
+        self.season_mean[ids, weekday] = np.where(s_n == 0, x, s_mean + self.alpha * (x - s_mean))
+        self.season_count[ids, weekday] = s_n + 1
+        self.count[ids] = n + 1
+        return scores
+
+    def _ewma(self, x: np.ndarray, mean: np.ndarray, var: np.ndarray, first: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        diff = x - mean
+        incr = self.alpha * diff
+        return np.where(first, x, mean + incr), np.where(first, 0.0, (1 - self.alpha) * (var + diff * incr))
+
+
+class AnomalySeries:
+    """One family of series, e.g. queue compliance per zone x time window.
+
+    Each series is an (entity, slot) pair where the slot is the time of day, so
+    every statistic is an hour-of-day seasonal baseline for that entity.
+    `direction` is "low" when drops are bad and "high" when rises are bad.
+    """
+
+    def __init__(self, kind: str, dataset: str, entity: str, slot: str, metric: str, direction: str,
+                 threshold: float, stats: StreamingStats):
+        self.kind = kind
+        self.dataset = dataset
+        self.entity = entity
+        self.slot = slot
+        self.metric = metric
+        self.sign = -1.0 if direction == "low" else 1.0
+        self.threshold = threshold
+        self.stats = stats
+        self.reset()
+
+    def reset(self):
+        self.stats = StreamingStats(self.stats.window, self.stats.alpha, self.stats.min_observations,
+                                    self.stats.min_seasonal_observations, self.stats.min_std)
+        self.keys = pd.Index([], dtype=object)
+        self.last_date: Optional[pd.Timestamp] = None
+        # Rows ingested so far and the source signature they were read from
+        self.observations = 0
+        self.signature: Optional[Tuple[int, int]] = None
+        self._chunks: List[Dict[str, np.ndarray]] = []
+        self._history: Optional[pd.DataFrame] = None
+
+    def copy(self) -> "AnomalySeries":
+        """Independent state for the next data version; scored chunks are shared, never mutated."""
+        clone = copy.copy(self)
+        clone.stats = copy.deepcopy(self.stats)
+        clone._chunks = list(self._chunks)
+        return clone
+
+    @property
+    def columns(self) -> List[str]:
+        return ["date", self.entity, self.slot, self.metric]
+
+    def _series_ids(self, df: pd.DataFrame) -> np.ndarray:
+        keys = pd.Index(list(zip(df[self.entity].astype(str), df[self.slot].astype(str))), tupleize_cols=False)
+        ids = self.keys.get_indexer(keys)
+        new = keys[ids < 0].unique()
+        if len(new):
+            self.keys = self.keys.append(new)
+            self.stats.reserve(len(self.keys))
+            ids = self.keys.get_indexer(keys)
+        return ids
+
+    def ingest(self, df: pd.DataFrame):
+        """Fold in observations newer than anything seen so far, one date at a time."""
+        if self.last_date is not None:
+            df = df[df["date"] > self.last_date]
+        df = df[df[self.metric].notna()]
+        if len(df) == 0:
+            return
+        self.observations += len(df)
+        # A batch holds at most one observation per series: order by date, then occurrence
+        ids = self._series_ids(df)
+        occurrence = pd.Series(ids).groupby([df["date"].to_numpy(), ids]).cumcount().to_numpy()
+        order = np.lexsort((occurrence, df["date"].to_numpy()))
+        dates = df["date"].to_numpy()[order]
+        ids = ids[order]
+        occurrence = occurrence[order]
+        values = df[self.metric].to_numpy(dtype=np.float64)[order]
+
+        bounds = np.flatnonzero((dates[1:] != dates[:-1]) | (occurrence[1:] != occurrence[:-1])) + 1
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(ids)]):
+            date = pd.Timestamp(dates[lo])
+            scores = self.stats.update(ids[lo:hi], values[lo:hi], date.dayofweek)
+            self._chunks.append({"date": dates[lo:hi], "series": ids[lo:hi], "value": values[lo:hi], **scores})
+        self.last_date = pd.Timestamp(dates[-1])
+        self._history = None
+
+    def history(self) -> pd.DataFrame:
+        """Every scored observation, in ingestion (date) order."""
+        if self._history is None:
+            if self._chunks:
+                merged = {name: np.concatenate([chunk[name] for chunk in self._chunks]) for name in self._chunks[0]}
+                self._chunks = [merged]
+                columns = dict(merged)
+            else:
+                columns = {name: np.array([]) for name in ("date", "series", "value", "expected", "z_rolling", "z_ewma", "z_seasonal")}
+            keys = self.keys[columns.pop("series").astype(np.int64)] if len(self.keys) else []
+            z = np.vstack([columns["z_rolling"], columns["z_ewma"], columns["z_seasonal"]]) * self.sign
+            score = np.max(np.where(np.isnan(z), -np.inf, z), axis=0) if z.shape[1] else np.array([])
+            score = np.where(np.isinf(score), np.nan, score)
+            self._history = pd.DataFrame({
+                "date": pd.to_datetime(columns.pop("date")),
+                "kind": self.kind,
+                "entity": [key[0] for key in keys],
+                "slot": [key[1] for key in keys],
+                **columns,
+                "score": score,
+                "is_anomaly": score >= self.threshold,
+            })
+        return self._history
+
+
+class AnomalyEngine:
+    def __init__(self, series: List[AnomalySeries], threshold: float):
+        self.series = {s.kind: s for s in series}
+        self.threshold = threshold
+
+    def copy(self) -> "AnomalyEngine":
+        return AnomalyEngine([s.copy() for s in self.series.values()], self.threshold)
+
+    def ingest(self, dl):
+        """Bring every series up to date with the loader's snapshot.
+
+        Only dates after the last one ingested are read, in INGEST_DAYS windows
+        of projected columns. A series whose source changed before that date (rows
+        added or removed in the past) is re-ingested from scratch.
+        """
+        for s in self.series.values():
+            signature = dl.snapshot().signature[s.dataset]
+            if signature == s.signature:
+                continue
+            bounds = dl.date_bounds(s.dataset)
+            if s.last_date is not None:
+                seen = dl.scan(s.dataset, [s.metric], end=s.last_date)[s.metric].notna().sum()
+                if bounds is None or seen != s.observations:
+                    s.reset()
+            if bounds is not None:
+                start = bounds[0] if s.last_date is None else s.last_date + pd.Timedelta(days=1)
+                while start <= bounds[1]:
+                    end = start + pd.Timedelta(days=INGEST_DAYS - 1)
+                    s.ingest(dl.scan(s.dataset, s.columns, start, end))
+                    start = end + pd.Timedelta(days=1)
+            s.signature = signature
+
+    def scores(self, date, kinds: Optional[List[str]] = None) -> pd.DataFrame:
+        """Scored observations on `date`, highest score first."""
+        date = pd.Timestamp(date)
+        parts = []
+        for kind, s in self.series.items():
+            if kinds and kind not in kinds:
+                continue
+            history = s.history()
+            dates = history["date"].to_numpy()
+            lo, hi = np.searchsorted(dates, date.to_datetime64(), side="left"), np.searchsorted(dates, date.to_datetime64(), side="right")
+            parts.append(history.iloc[lo:hi])
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts, ignore_index=True).sort_values("score", ascending=False, na_position="last", kind="stable")
+
+    def flagged(self, date, kinds: Optional[List[str]] = None) -> pd.DataFrame:
+        scores = self.scores(date, kinds)
+        return scores[scores["is_anomaly"]] if len(scores) else scores
+
+    def series_counts(self) -> Dict[str, int]:
+        return {kind: len(s.keys) for kind, s in self.series.items()}
+
+
+def build_anomaly_engine(dl) -> AnomalyEngine:
+    config = CONFIG["dashboard"].get("anomaly_detection", {})
+    threshold = SENSITIVITY_THRESHOLDS.get(config.get("sensitivity", "medium"), 3.0)
+
+    def stats() -> StreamingStats:
+        return StreamingStats(
+            window=config.get("rolling_window", 14),
+            alpha=config.get("ewma_alpha", 0.2),
+            min_observations=config.get("min_observations", 7),
+        )
+
+    # On reload, continue from the previous version's state and ingest only the new dates
+    previous = dl.previous(build_anomaly_engine)
+    if previous is not None:
+        engine = previous.copy()
+    else:
+        engine = AnomalyEngine([
+            AnomalySeries("queue", "queue_zone_compliance", "zone", "time_window", "actual_compliance_pct", "low", threshold, stats()),
+            AnomalySeries("security", "security_lanes_hourly", "lane", "hour", "reject_rate_pct", "high", threshold, stats()),
+        ], threshold)
+    engine.ingest(dl)
+    return engine
@@ -34,25 +34,35 @@ class MetricsCalculator:
 class AnomalyDetector:
     @staticmethod
     def detect_queue_anomalies(df: pd.DataFrame, target_pct: float = 95.0) -> pd.DataFrame:
-        df = df.copy()
-        df["is_anomaly"] = df["actual_compliance_pct"] < target_pct
+        anomalies = df[df["actual_compliance_pct"].to_numpy() < target_pct]
+        variance = anomalies["variance_from_target"].to_numpy()
+        severity = np.select([variance >= -3, variance >= -7], ["Low", "Medium"], default="High")
+        return anomalies.assign(is_anomaly=True, anomaly_severity=severity)
 
-        def classify_severity(variance):
-            if variance >= -3:
-                return "Low"
-            elif variance >= -7:
-                return "Medium"
-            else:
-                return "High"
-
-        df["anomaly_severity"] = df["variance_from_target"].apply(classify_severity)
-        return df[df["is_anomaly"]]
+    @staticmethod
+    def _lane_anomalies(df: pd.DataFrame, throughput_threshold, reject_threshold: float) -> pd.DataFrame:
+        high_reject = df["reject_rate_pct"].to_numpy() > reject_threshold
+        low_throughput = df["cleared_volume"].to_numpy() < throughput_threshold
+        is_anomaly = high_reject | low_throughput
+        return df[is_anomaly].assign(high_reject=high_reject[is_anomaly], low_throughput=low_throughput[is_anomaly], is_anomaly=True)
 
     @staticmethod
     def detect_security_lane_anomalies(df: pd.DataFrame, reject_threshold: float = 8.0) -> pd.DataFrame:
-        df = df.copy()
-        df["high_reject"] = df["reject_rate_pct"] > reject_threshold
         throughput_threshold = df["cleared_volume"].quantile(0.25)
-        df["low_throughput"] = df["cleared_volume"] < throughput_threshold
-        df["is_anomaly"] = df["high_reject"] | df["low_throughput"]
-        return df[df["is_anomaly"]]
+        return AnomalyDetector._lane_anomalies(df, throughput_threshold, reject_threshold)
+
+    # Batch variants over multi-date frames, e.g. to build an anomaly history table.
+    # Rows keep their input order, so splitting the result by date gives exactly
+    # what the single-date calls return.
+
+    @staticmethod
+    def queue_anomaly_history(df: pd.DataFrame, target_pct: float = 95.0) -> pd.DataFrame:
+        # Queue anomalies depend only on the row itself
+        return AnomalyDetector.detect_queue_anomalies(df, target_pct)
+
+    @staticmethod
+    def security_lane_anomaly_history(df: pd.DataFrame, reject_threshold: float = 8.0) -> pd.DataFrame:
+        # The low-throughput cut-off is the 25th percentile of each date's lanes
+        quantiles = df.groupby("date")["cleared_volume"].quantile(0.25)
+        throughput_threshold = df["date"].map(quantiles).to_numpy(dtype=np.float64)
+        return AnomalyDetector._lane_anomalies(df, throughput_threshold, reject_threshold)
@@ -1,81 +1,483 @@
+import asyncio
+import os
+import threading
+import time
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Dict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from backend.core.cache import LRUCache
 from backend.core.config import CONFIG, DATA_DIR
 
 
+# Dataset names. Each is stored in DATA_DIR either as a flat <name>.parquet file or
+# as a Hive-partitioned directory dataset=<name>/month=YYYY-MM/*.parquet.
+DATASETS = [
+    "pax_daily_volumes",
+    "pax_hourly_showup",
+    "pax_by_airline",
+    "atm_daily",
+    "queue_zone_compliance",
+    "queue_hourly_compliance",
+    "security_lanes_daily",
+    "security_lanes_hourly",
+    "baggage_utilization",
+    "gate_utilization",
+    "biometric_adoption",
+    "voc_feedback",
+    "voc_messages",
+]
+
+# Low-cardinality label columns stored as pandas categoricals. Free-text columns
+# (voc_messages.message, baggage_utilization.primary_airlines) stay as strings.
+CATEGORICAL_COLUMNS = {
+    "terminal", "flow", "passenger_type", "type", "checkpoint", "airline",
+    "zone", "zone_type", "time_window", "lane", "lane_group",
+    "belt", "belt_type", "gate", "boarding_mode", "channel",
+    "department", "media_type", "media", "sentiment",
+}
+
+
+def normalize_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert label columns to sorted categoricals and downcast integer counts to int32."""
+    for col in df.columns:
+        dtype = df[col].dtype
+        if col in CATEGORICAL_COLUMNS:
+            if not isinstance(dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype("category")
+            elif not dtype.categories.is_monotonic_increasing:
+                df[col] = df[col].cat.reorder_categories(dtype.categories.sort_values())
+        elif pd.api.types.is_integer_dtype(dtype) and dtype.itemsize > 4:
+            if len(df) == 0 or (df[col].min() >= np.iinfo(np.int32).min and df[col].max() <= np.iinfo(np.int32).max):
+                df[col] = df[col].astype(np.int32)
+    return df
+
+
+class DataSnapshot:
+    """One consistent generation of every dataset, tagged with a version number."""
+
+    def __init__(self, version: int, signature: Dict[str, Tuple[int, int]], lazy: Set[str], slice_cache_size: int):
+        self.version = version
+        self.signature = signature
+        # Datasets in `lazy` are never held in memory as a whole; date slices are
+        # scanned from disk on demand and kept in a bounded LRU.
+        self.lazy = lazy
+        self.slice_cache = LRUCache(slice_cache_size)
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.date_index: Dict[str, np.ndarray] = {}
+        self.date_bounds: Dict[str, Optional[Tuple[pd.Timestamp, pd.Timestamp]]] = {}
+        self.load_stats: Dict[str, Dict] = {}
+        # Structures computed from the frames (rollups, model state), keyed by builder
+        self.derived: Dict[Callable, Any] = {}
+        self.derived_lock = threading.RLock()
+        # Created up front so that lock creation itself never races
+        self.locks = {name: threading.Lock() for name in DATASETS}
+
+    def add(self, name: str, df: pd.DataFrame):
+        self.date_index[name] = df["date"].to_numpy()
+        self.frames[name] = df
+
+
+_pinned_snapshot: ContextVar[Optional[DataSnapshot]] = ContextVar("pinned_snapshot", default=None)
+_shared_slices: ContextVar[Optional[Dict[Tuple, pd.DataFrame]]] = ContextVar("shared_slices", default=None)
+
+
 class DataLoader:
     def __init__(self):
         self.data_dir = DATA_DIR
         self.report_date = pd.to_datetime(CONFIG["data"]["report_date"])
-        self._passenger_data = None
-        self._atm_data = None
-        self._queue_data = None
-        self._security_data = None
-        self._baggage_data = None
-        self._gate_data = None
-        self._biometric_data = None
-        self._voc_data = None
+        self.load_workers = CONFIG["data"].get("load_workers", 4)
+        self.ipc_cache = CONFIG["data"].get("ipc_cache", True)
+        self.mode = CONFIG["data"].get("mode", "auto")
+        self.memory_ceiling_mb = CONFIG["data"].get("memory_ceiling_mb", 1024)
+        self.slice_cache_size = CONFIG["data"].get("slice_cache_size", 256)
+        self._snapshot = self._new_snapshot(1)
+
+    @property
+    def version(self) -> int:
+        return self.snapshot().version
+
+    def snapshot(self) -> DataSnapshot:
+        return _pinned_snapshot.get() or self._snapshot
+
+    @contextmanager
+    def pinned(self):
+        """Serve every lookup inside the block from the snapshot active on entry."""
+        token = _pinned_snapshot.set(self._snapshot)
+        try:
+            yield
+        finally:
+            _pinned_snapshot.reset(token)
+
+    @contextmanager
+    def shared_slices(self):
+        """Memoize slice/range results inside the block, so work batched into one
+        request filters each (dataset, date range) once."""
+        token = _shared_slices.set({})
+        try:
+            yield
+        finally:
+            _shared_slices.reset(token)
+
+    def _new_snapshot(self, version: int) -> DataSnapshot:
+        return DataSnapshot(version, self._signature(), self._plan_lazy(), self.slice_cache_size)
+
+    def _plan_lazy(self) -> Set[str]:
+        # "auto" keeps the smallest datasets in memory until their estimated decoded
+        # size reaches memory_ceiling_mb; everything beyond that is served lazily.
+        if self.mode == "eager":
+            return set()
+        if self.mode == "lazy":
+            return set(DATASETS)
+        estimates = {name: self._estimate_bytes(name) for name in DATASETS}
+        budget = self.memory_ceiling_mb * 1024 * 1024
+        lazy = set()
+        for name in sorted(DATASETS, key=estimates.get):
+            if estimates[name] <= budget:
+                budget -= estimates[name]
+            else:
+                lazy.add(name)
+        return lazy
+
+    def _estimate_bytes(self, name: str) -> int:
+        total = 0
+        for path in self._source_files(name):
+            metadata = pq.ParquetFile(path).metadata
+            total += sum(metadata.row_group(i).total_byte_size for i in range(metadata.num_row_groups))
+        return total
 
     def load_all(self):
-        self.load_passenger_data()
-        self.load_atm_data()
-        self.load_queue_data()
-        self.load_security_data()
-        self.load_baggage_data()
-        self.load_gate_data()
-        self.load_biometric_data()
-        self.load_voc_data()
+        self._load_into(self._snapshot)
+
+    def _load_into(self, snapshot: DataSnapshot):
+        # pyarrow releases the GIL while decoding, so a small pool overlaps file reads
+        started = time.perf_counter()
+        eager = [name for name in DATASETS if name not in snapshot.lazy]
+        with ThreadPoolExecutor(max_workers=self.load_workers, thread_name_prefix="data-load") as pool:
+            list(pool.map(lambda name: self._frame_in(snapshot, name), eager))
+        for name in snapshot.lazy:
+            snapshot.load_stats[name] = {"rows": self._open_dataset(name).count_rows(), "load_ms": 0.0, "mode": "lazy"}
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for name in DATASETS:
+            stats = snapshot.load_stats[name]
+            print(f"  {name}: {stats['rows']:,} rows in {stats['load_ms']} ms ({stats['mode']})")
+        total_rows = sum(stats["rows"] for stats in snapshot.load_stats.values())
+        print(f"Loaded {len(snapshot.frames)} datasets, {len(snapshot.lazy)} lazy ({total_rows:,} rows) in {elapsed_ms:.0f} ms")
+
+    def _source_path(self, name: str) -> Path:
+        partitioned = self.data_dir / f"dataset={name}"
+        return partitioned if partitioned.is_dir() else self.data_dir / f"{name}.parquet"
+
+    def _source_files(self, name: str) -> List[Path]:
+        path = self._source_path(name)
+        if path.is_dir():
+            return sorted(path.rglob("*.parquet"))
+        return [path] if path.exists() else []
+
+    def _source_signature(self, name: str) -> Tuple[int, int]:
+        stats = [path.stat() for path in self._source_files(name)]
+        if not stats:
+            return (0, 0)
+        return (max(stat.st_mtime_ns for stat in stats), sum(stat.st_size for stat in stats) + len(stats))
+
+    def _signature(self) -> Dict[str, Tuple[int, int]]:
+        return {name: self._source_signature(name) for name in DATASETS}
+
+    def has_changed(self) -> bool:
+        return self._signature() != self._snapshot.signature
+
+    def reload(self) -> int:
+        # Build the next snapshot completely before publishing it; the swap is a
+        # single reference assignment so readers never observe a partial reload.
+        snapshot = self._new_snapshot(self._snapshot.version + 1)
+        self._load_into(snapshot)
+        for builder in list(self._snapshot.derived):
+            self._derived_in(snapshot, builder)
+        self._snapshot = snapshot
+        return snapshot.version
+
+    async def watch(self, interval: float, on_reload: Optional[Callable[[int], Any]] = None):
+        """Poll data_dir for changed parquet files and reload them in a worker thread.
+
+        `on_reload(version)` is called on the event loop after each published reload.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if await asyncio.to_thread(self.has_changed):
+                    version = await asyncio.to_thread(self.reload)
+                    print(f"[+] Data reloaded (version {version})")
+                    if on_reload is not None:
+                        on_reload(version)
+            except Exception as e:
+                print(f"[!] Data reload failed: {e}. Keeping version {self._snapshot.version}.")
+
+    def _read(self, name: str) -> pd.DataFrame:
+        mtime_ns, size = self._source_signature(name)
+        source = f"{mtime_ns}:{size}".encode()
+
+        if self.ipc_cache:
+            df = self._read_ipc(name, source)
+            if df is not None:
+                return df
+
+        # Rows are stably sorted by date so each date occupies one contiguous block;
+        # within a date the original row order is preserved.
+        df = self._to_pandas(self._open_dataset(name))
+        if not df["date"].is_monotonic_increasing:
+            df = df.sort_values("date", kind="stable")
+        df = normalize_schema(df.reset_index(drop=True))
+
+        if self.ipc_cache:
+            self._write_ipc(name, df, source)
+        return df
+
+    def _read_ipc(self, name: str, source: bytes) -> Optional[pd.DataFrame]:
+        # The uncompressed Arrow IPC snapshot is memory-mapped, so every worker process
+        # shares the same OS page cache and primitive columns are not copied.
+        path = self.data_dir / f"{name}.arrow"
+        if not path.exists():
+            return None
+        try:
+            table = feather.read_table(path, memory_map=True)
+        except (OSError, pa.ArrowInvalid):
+            return None
+        if (table.schema.metadata or {}).get(b"source") != source:
+            return None
+        return normalize_schema(table.to_pandas(split_blocks=True))
+
+    def _write_ipc(self, name: str, df: pd.DataFrame, source: bytes):
+        # Written under a unique temporary name and renamed into place, so workers
+        # racing to materialize the same snapshot never see a partial file.
+        path = self.data_dir / f"{name}.arrow"
+        tmp_path = path.with_suffix(f".arrow.{os.getpid()}.{threading.get_ident()}.tmp")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"source": source})
+        try:
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[!] Could not write Arrow snapshot for {name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def _frame_in(self, snapshot: DataSnapshot, dataset: str) -> pd.DataFrame:
+        # Single-flight lazy load: the first caller reads the file while concurrent
+        # callers for the same dataset block on its lock and reuse the result.
+        df = snapshot.frames.get(dataset)
+        if df is None:
+            with snapshot.locks[dataset]:
+                df = snapshot.frames.get(dataset)
+                if df is None:
+                    started = time.perf_counter()
+                    df = self._read(dataset)
+                    load_ms = round((time.perf_counter() - started) * 1000, 1)
+                    snapshot.load_stats[dataset] = {"rows": len(df), "load_ms": load_ms, "mode": "eager"}
+                    snapshot.add(dataset, df)
+        return df
+
+    def frame(self, dataset: str) -> pd.DataFrame:
+        """The whole dataset; for lazy datasets this reads every row, prefer slice/range/scan."""
+        snapshot = self.snapshot()
+        if dataset in snapshot.lazy:
+            # Lazy datasets are never held in memory as a whole, so the result is not kept
+            return self._read_range(dataset, None, None, None)
+        return self._frame_in(snapshot, dataset)
+
+    def columns(self, dataset: str) -> List[str]:
+        """Column names of `dataset`, without reading its rows."""
+        snapshot = self.snapshot()
+        if dataset in snapshot.lazy:
+            source = self._open_dataset(dataset)
+            partitioning = getattr(source, "partitioning", None)
+            partition_keys = set(partitioning.schema.names) if isinstance(partitioning, ds.HivePartitioning) else set()
+            return [name for name in source.schema.names if name not in partition_keys]
+        return list(self._frame_in(snapshot, dataset).columns)
+
+    def date_bounds(self, dataset: str) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """First and last date of `dataset`, or None when it has no rows."""
+        snapshot = self.snapshot()
+        if dataset not in snapshot.lazy:
+            dates = self._frame_in(snapshot, dataset)["date"]
+            return (dates.iloc[0], dates.iloc[-1]) if len(dates) else None
+        if dataset not in snapshot.date_bounds:
+            # Only the date column is read, once per snapshot
+            dates = self._open_dataset(dataset).to_table(columns=["date"]).column("date")
+            bounds = pc.min_max(dates).as_py() if len(dates) else None
+            snapshot.date_bounds[dataset] = (pd.Timestamp(bounds["min"]), pd.Timestamp(bounds["max"])) if bounds else None
+        return snapshot.date_bounds[dataset]
+
+    def scan(self, dataset: str, columns: Sequence[str], start=None, end=None) -> pd.DataFrame:
+        """Rows of `dataset` projected to `columns`, for bulk reads such as derived builders.
+
+        Unlike range(), lazy datasets are read straight from disk without entering
+        the slice cache, so a read over the whole history never stays resident.
+        `start` and `end` default to the first and last date.
+        """
+        snapshot = self.snapshot()
+        if dataset in snapshot.lazy:
+            return self._read_range(dataset, start, end, columns)
+        df = self._frame_in(snapshot, dataset)
+        if start is not None or end is not None:
+            dates = snapshot.date_index[dataset]
+            df = df.iloc[self._bounds(snapshot, dataset, dates[0] if start is None else start,
+                                      dates[-1] if end is None else end)] if len(dates) else df
+        return df[list(columns)]
+
+    def derived(self, builder: Callable[["DataLoader"], Any]) -> Any:
+        """Result of `builder(loader)` for the current snapshot, built once per data version.
+
+        Anything derived from the previous snapshot is rebuilt before a reload is
+        published, so requests never pay for it after the first use.
+        """
+        return self._derived_in(self.snapshot(), builder)
+
+    def previous(self, builder: Callable[["DataLoader"], Any]) -> Any:
+        """While a reload builds the next snapshot, what `builder` built for the published one.
+
+        Lets a builder carry incremental state forward instead of starting over;
+        None outside a reload or when the published snapshot never built it.
+        """
+        snapshot = self.snapshot()
+        if snapshot is self._snapshot:
+            return None
+        return self._snapshot.derived.get(builder)
+
+    def _derived_in(self, snapshot: DataSnapshot, builder: Callable) -> Any:
+        if builder not in snapshot.derived:
+            with snapshot.derived_lock:
+                if builder not in snapshot.derived:
+                    token = _pinned_snapshot.set(snapshot)
+                    try:
+                        snapshot.derived[builder] = builder(self)
+                    finally:
+                        _pinned_snapshot.reset(token)
+        return snapshot.derived[builder]
+
+    def _bounds(self, snapshot: DataSnapshot, dataset: str, start, end) -> slice:
+        dates = snapshot.date_index[dataset]
+        lo = np.searchsorted(dates, pd.Timestamp(start).to_datetime64().astype(dates.dtype), side="left")
+        hi = np.searchsorted(dates, pd.Timestamp(end).to_datetime64().astype(dates.dtype), side="right")
+        return slice(int(lo), int(max(lo, hi)))
+
+    def slice(self, dataset: str, date, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Rows of `dataset` for a single date."""
+        return self.range(dataset, date, date, columns)
+
+    def range(self, dataset: str, start, end, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Rows of `dataset` with start <= date <= end, optionally projected to `columns`.
+
+        In-memory datasets are located by binary search on the date index; lazy
+        datasets are scanned from disk with the date filter pushed down to parquet.
+        """
+        shared = _shared_slices.get()
+        if shared is not None:
+            key = (dataset, pd.Timestamp(start), pd.Timestamp(end), tuple(columns) if columns is not None else None)
+            if key not in shared:
+                shared[key] = self._range_in(self.snapshot(), dataset, start, end, columns)
+            return shared[key]
+        return self._range_in(self.snapshot(), dataset, start, end, columns)
+
+    def _range_in(self, snapshot: DataSnapshot, dataset: str, start, end, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+        if dataset in snapshot.lazy:
+            return self._scan(snapshot, dataset, start, end, columns)
+        df = self._frame_in(snapshot, dataset)
+        rows = df.iloc[self._bounds(snapshot, dataset, start, end)]
+        return rows if columns is None else rows[list(columns)]
+
+    def _open_dataset(self, name: str) -> ds.Dataset:
+        path = self._source_path(name)
+        if path.is_dir():
+            return ds.dataset(path, format="parquet", partitioning=ds.HivePartitioning.discover())
+        return ds.dataset(path, format="parquet")
+
+    def _to_pandas(self, source: ds.Dataset, columns: Optional[List[str]] = None, predicate=None) -> pd.DataFrame:
+        # Hive partition keys (month=...) are a storage detail, not part of the schema
+        if columns is None:
+            partitioning = getattr(source, "partitioning", None)
+            partition_keys = set(partitioning.schema.names) if isinstance(partitioning, ds.HivePartitioning) else set()
+            columns = [name for name in source.schema.names if name not in partition_keys]
+        return source.to_table(columns=columns, filter=predicate).to_pandas()
+
+    def _scan(self, snapshot: DataSnapshot, dataset: str, start, end, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        key = (dataset, start, end, tuple(columns) if columns is not None else None)
+        cached = snapshot.slice_cache.get(key)
+        if cached is not None:
+            return cached
+
+        df = self._read_range(dataset, start, end, columns)
+        snapshot.slice_cache.put(key, df)
+        return df
+
+    def _read_range(self, dataset: str, start, end, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+        # Uncached date-filtered read from disk; an open bound reads from the first or to the last date
+        source = self._open_dataset(dataset)
+        date_type = source.schema.field("date").type
+        partitioning = getattr(source, "partitioning", None)
+        by_month = isinstance(partitioning, ds.HivePartitioning) and "month" in partitioning.schema.names
+        predicate = None
+        if start is not None:
+            start = pd.Timestamp(start)
+            predicate = ds.field("date") >= pa.scalar(start, type=date_type)
+            if by_month:
+                # Prune whole month directories before any file footer is opened
+                predicate &= ds.field("month") >= start.strftime("%Y-%m")
+        if end is not None:
+            end = pd.Timestamp(end)
+            upper = ds.field("date") <= pa.scalar(end, type=date_type)
+            if by_month:
+                upper &= ds.field("month") <= end.strftime("%Y-%m")
+            predicate = upper if predicate is None else predicate & upper
+        projection = None if columns is None else ["date"] + [col for col in columns if col != "date"]
+        df = self._to_pandas(source, projection, predicate)
+        if not df["date"].is_monotonic_increasing:
+            df = df.sort_values("date", kind="stable")
+        df = normalize_schema(df.reset_index(drop=True))
+        if columns is not None:
+            df = df[list(columns)]
+        return df
 
     def load_passenger_data(self) -> Dict[str, pd.DataFrame]:
-        if self._passenger_data is None:
-            self._passenger_data = {
-                "daily": pd.read_parquet(self.data_dir / "pax_daily_volumes.parquet"),
-                "hourly_showup": pd.read_parquet(self.data_dir / "pax_hourly_showup.parquet"),
-                "by_airline": pd.read_parquet(self.data_dir / "pax_by_airline.parquet"),
-            }
-        return self._passenger_data
+        return {
+            "daily": self.frame("pax_daily_volumes"),
+            "hourly_showup": self.frame("pax_hourly_showup"),
+            "by_airline": self.frame("pax_by_airline"),
+        }
 
     def load_atm_data(self) -> pd.DataFrame:
-        if self._atm_data is None:
-            self._atm_data = pd.read_parquet(self.data_dir / "atm_daily.parquet")
-        return self._atm_data
+        return self.frame("atm_daily")
 
     def load_queue_data(self) -> Dict[str, pd.DataFrame]:
-        if self._queue_data is None:
-            self._queue_data = {
-                "zone_compliance": pd.read_parquet(self.data_dir / "queue_zone_compliance.parquet"),
-                "hourly_compliance": pd.read_parquet(self.data_dir / "queue_hourly_compliance.parquet"),
-            }
-        return self._queue_data
+        return {
+            "zone_compliance": self.frame("queue_zone_compliance"),
+            "hourly_compliance": self.frame("queue_hourly_compliance"),
+        }
 
     def load_security_data(self) -> Dict[str, pd.DataFrame]:
-        if self._security_data is None:
-            self._security_data = {
-                "daily": pd.read_parquet(self.data_dir / "security_lanes_daily.parquet"),
-                "hourly": pd.read_parquet(self.data_dir / "security_lanes_hourly.parquet"),
-            }
-        return self._security_data
+        return {
+            "daily": self.frame("security_lanes_daily"),
+            "hourly": self.frame("security_lanes_hourly"),
+        }
 
     def load_baggage_data(self) -> pd.DataFrame:
-        if self._baggage_data is None:
-            self._baggage_data = pd.read_parquet(self.data_dir / "baggage_utilization.parquet")
-        return self._baggage_data
+        return self.frame("baggage_utilization")
 
     def load_gate_data(self) -> pd.DataFrame:
-        if self._gate_data is None:
-            self._gate_data = pd.read_parquet(self.data_dir / "gate_utilization.parquet")
-        return self._gate_data
+        return self.frame("gate_utilization")
 
     def load_biometric_data(self) -> pd.DataFrame:
-        if self._biometric_data is None:
-            self._biometric_data = pd.read_parquet(self.data_dir / "biometric_adoption.parquet")
-        return self._biometric_data
+        return self.frame("biometric_adoption")
 
     def load_voc_data(self) -> Dict[str, pd.DataFrame]:
-        if self._voc_data is None:
-            self._voc_data = {
-                "feedback": pd.read_parquet(self.data_dir / "voc_feedback.parquet"),
-                "messages": pd.read_parquet(self.data_dir / "voc_messages.parquet"),
-            }
-        return self._voc_data
+        return {
+            "feedback": self.frame("voc_feedback"),
+            "messages": self.frame("voc_messages"),
+        }
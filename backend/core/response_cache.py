@@ -0,0 +1,75 @@
+import hashlib
+from typing import Dict, Optional, Tuple
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from backend.core.cache import LRUCache
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, etag: str, headers: Dict[str, str]):
+        self.body = body
+        self.etag = etag
+        self.headers = headers
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    """LRU of rendered GET responses with hit, miss and 304 counters."""
+
+    def __init__(self, max_entries: int = 2048, max_bytes: Optional[int] = None):
+        self.entries = LRUCache(max_entries, max_bytes)
+        self.not_modified = 0
+
+    def stats(self) -> dict:
+        return {**self.entries.stats(), "not_modified": self.not_modified}
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """Cache GET responses per (path, normalized query, data version) with strong ETags.
+
+    A request whose If-None-Match matches the cached ETag is answered with 304
+    without running the endpoint. Responses are cached only for status 200.
+    Endpoints under the cache must be a pure function of the request and data
+    version; anything reporting live counters belongs under an excluded prefix.
+    """
+
+    def __init__(self, app, cache: ResponseCache, prefix: str = "/api/",
+                 exclude: Tuple[str, ...] = ("/api/health", "/api/chat")):
+        super().__init__(app)
+        self.cache = cache
+        self.prefix = prefix
+        self.exclude = exclude
+
+    async def dispatch(self, request: Request, call_next):
+        path = request.url.path
+        if request.method != "GET" or not path.startswith(self.prefix) or path.startswith(self.exclude):
+            return await call_next(request)
+
+        version = request.app.state.data_loader.version
+        key = (path, tuple(sorted(request.query_params.multi_items())), version)
+
+        entry = self.cache.entries.get(key)
+        if entry is None:
+            response = await call_next(request)
+            if response.status_code != 200:
+                return response
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+            entry = CachedResponse(body, etag, headers)
+            self.cache.entries.put(key, entry, size=len(body))
+
+        cache_headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            self.cache.not_modified += 1
+            return Response(status_code=304, headers=cache_headers)
+        return Response(content=entry.body, status_code=200, headers={**entry.headers, **cache_headers})
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterable
+
+
+# Additive per-(date, terminal) components of the overview KPIs
+SUM_FIELDS = [
+    "pax_total", "pax_domestic", "pax_international",
+    "complaints", "compliments",
+    "bio_registrations", "bio_eligible",
+]
+
+# Averaged KPIs: name -> (dataset, column). Each is rolled up as a <name>_sum and
+# <name>_n column, so a mean over any set of terminals is sum(sums) / sum(counts).
+# Sums are kept in integer millionths, so they add up exactly whatever the terminals
+# or their order, and the mean is rounded half away from zero in decimal.
+MEAN_FIELDS = {
+    "pax_vs_7day": ("pax_daily_volumes", "pax_count_vs_7day_pct"),
+    "compliance": ("queue_zone_compliance", "actual_compliance_pct"),
+    "reject": ("security_lanes_daily", "reject_rate_pct"),
+}
+
+# Integer sums stay exact in the float64 rollup matrix up to 2**53 millionths
+MEAN_SCALE = 10 ** 6
+
+FIELDS = SUM_FIELDS + [f"{name}_{part}" for name in MEAN_FIELDS for part in ("sum", "n")]
+
+
+class KPIRollup:
+    """Overview KPI components materialized once per data version."""
+
+    def __init__(self, table: pd.DataFrame):
+        self.table = table
+        self._values = table[FIELDS].to_numpy(dtype=np.float64)
+        self._rows = {(date, terminal): i for i, (date, terminal) in enumerate(zip(table["date"], table["terminal"]))}
+
+    def totals(self, date, terminals: Iterable[str], decimals: int = 1) -> Dict[str, float]:
+        """Sum of every component over `terminals` on `date`; averaged KPIs come back as
+        <name>, rounded to `decimals` (None without samples), and their sample count <name>_n."""
+        date = pd.Timestamp(date)
+        # dict.fromkeys de-duplicates like the Series.isin filter it replaces
+        terminals = dict.fromkeys(terminals)
+        rows = [self._rows[(date, terminal)] for terminal in terminals if (date, terminal) in self._rows]
+        values = self._values[rows].sum(axis=0) if rows else np.zeros(len(FIELDS))
+        totals = dict(zip(FIELDS, values.tolist()))
+        for name in MEAN_FIELDS:
+            total, n = int(totals.pop(f"{name}_sum")), int(totals[f"{name}_n"])
+            totals[f"{name}_n"] = n
+            totals[name] = None
+            if n:
+                mean = Decimal(total) / (MEAN_SCALE * n)
+                totals[name] = float(mean.quantize(Decimal(1).scaleb(-decimals), rounding=ROUND_HALF_UP))
+        return totals
+
+
+def _by_date_terminal(part: pd.DataFrame) -> pd.DataFrame:
+    # Terminal categories differ between datasets; align on plain strings
+    part.index = part.index.set_levels(part.index.levels[1].astype(str), level=1)
+    return part
+
+
+def build_kpi_rollup(dl) -> KPIRollup:
+    # Column-projected scans: lazy datasets are read once and never kept whole in memory
+    keys = ["date", "terminal"]
+
+    pax = dl.scan("pax_daily_volumes", keys + ["passenger_type", "pax_count"])
+    pax_by_type = pax.pivot_table(index=keys, columns="passenger_type", values="pax_count", aggfunc="sum", observed=True)
+    parts = [_by_date_terminal(pd.DataFrame({
+        "pax_total": pax.groupby(keys, observed=True)["pax_count"].sum(),
+        "pax_domestic": pax_by_type.get("Domestic"),
+        "pax_international": pax_by_type.get("International"),
+    }))]
+
+    voc = dl.scan("voc_feedback", keys + ["complaints", "compliments"]).groupby(keys, observed=True)
+    parts.append(_by_date_terminal(pd.DataFrame({
+        "complaints": voc["complaints"].sum(),
+        "compliments": voc["compliments"].sum(),
+    })))
+
+    if "total_eligible_pax" in dl.columns("biometric_adoption"):
+        bio = dl.scan("biometric_adoption", keys + ["biometric_registrations", "total_eligible_pax"]).groupby(keys, observed=True)
+        parts.append(_by_date_terminal(pd.DataFrame({
+            "bio_registrations": bio["biometric_registrations"].sum(),
+            "bio_eligible": bio["total_eligible_pax"].sum(),
+        })))
+
+    for name, (dataset, column) in MEAN_FIELDS.items():
+        if column in dl.columns(dataset):
+            df = dl.scan(dataset, keys + [column])
+            scaled = (df[column] * MEAN_SCALE).round().astype("Int64")
+            grouped = scaled.groupby([df["date"], df["terminal"]], observed=True)
+            parts.append(_by_date_terminal(pd.DataFrame({f"{name}_sum": grouped.sum(), f"{name}_n": grouped.count()})))
+
+    table = pd.concat(parts, axis=1).reindex(columns=FIELDS).fillna(0).reset_index()
+    return KPIRollup(table)
@@ -0,0 +1,115 @@
+import json
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from typing import Any, Callable, Dict, List, Literal, Tuple, Union
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, with numpy arrays and scalars encoded natively.
+
+    Output is byte-identical to JSONResponse for the payloads this API produces;
+    without orjson installed it falls back to the standard encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fragment(body: bytes) -> Any:
+    """Already-rendered JSON to nest inside another ORJSONResponse payload without re-encoding it."""
+    if ORJSON_AVAILABLE:
+        # Fragment needs orjson 3.9; older releases re-parse, which is still cheap
+        return orjson.Fragment(body) if hasattr(orjson, "Fragment") else orjson.loads(body)
+    return json.loads(body)
+
+
+# Column converters: each turns a whole Series into a list of JSON-native values.
+
+def text(s: pd.Series) -> List:
+    return s.tolist()
+
+
+def integer(s: pd.Series) -> List[int]:
+    return s.to_numpy(dtype=np.int64).tolist()
+
+
+def real(s: pd.Series) -> List[float]:
+    return s.to_numpy(dtype=np.float64).tolist()
+
+
+def rounded(digits: int) -> Callable[[pd.Series], List[float]]:
+    # Python's round() rather than np.round so that ties (e.g. 92.35) resolve
+    # exactly as they did when rows were rounded one at a time.
+    def convert(s: pd.Series) -> List[float]:
+        return [round(value, digits) for value in s.to_numpy(dtype=np.float64).tolist()]
+    return convert
+
+
+def nullable(convert: Callable[[pd.Series], List]) -> Callable[[pd.Series], List]:
+    # NaN is not valid JSON; missing values are sent as null
+    def wrapped(s: pd.Series) -> List:
+        return [None if isinstance(value, float) and value != value else value for value in convert(s)]
+    return wrapped
+
+
+def day(s: pd.Series) -> List[str]:
+    return s.dt.strftime("%Y-%m-%d").tolist()
+
+
+Field = Union[Callable[[pd.Series], List], Tuple[str, Callable[[pd.Series], List]]]
+
+# Wire formats for table endpoints: row dicts (default), column lists, or an Arrow IPC stream
+TableFormat = Literal["records", "columnar", "arrow"]
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def _convert(df: pd.DataFrame, fields: Dict[str, Field]) -> Dict[str, List]:
+    converted = {}
+    for key, spec in fields.items():
+        column, convert = spec if isinstance(spec, tuple) else (key, spec)
+        converted[key] = convert(df[column])
+    return converted
+
+
+def to_records(df: pd.DataFrame, fields: Dict[str, Field]) -> List[Dict]:
+    """Build a list of row dicts column by column.
+
+    `fields` maps each output key to a converter, or to (source column, converter)
+    when the key differs from the column name. Keys keep the given order.
+    """
+    columns = _convert(df, fields)
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+
+def to_columns(df: pd.DataFrame, fields: Dict[str, Field]) -> Dict:
+    """Same values as to_records, laid out as {"columns": [...], "data": {key: [values]}}."""
+    columns = _convert(df, fields)
+    return {"columns": list(columns), "data": columns}
+
+
+def to_table(df: pd.DataFrame, fields: Dict[str, Field], format: TableFormat = "records") -> Union[List[Dict], Dict]:
+    if format == "columnar":
+        return to_columns(df, fields)
+    return to_records(df, fields)
+
+
+def arrow_response(df: pd.DataFrame, fields: Dict[str, Field]) -> Response:
+    """Encode the converted columns as a single-batch Arrow IPC stream."""
+    table = pa.table(_convert(df, fields))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(content=sink.getvalue().to_pybytes(), media_type=ARROW_MEDIA_TYPE)
@@ -1,17 +1,25 @@
 import sys
+import asyncio
 from pathlib import Path
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 # Add parent directory to path so 'backend' package is importable
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from backend.core.anomalies import build_anomaly_engine
 from backend.core.config import CONFIG
-from backend.core.data_loader import DataLoader
+from backend.core.data_loader import DataLoader, DATASETS
+from backend.core.rollups import build_kpi_rollup
+from backend.core.response_cache import ResponseCache, ResponseCacheMiddleware
+from backend.core.serialization import ORJSONResponse
+from backend.core.warmup import AnalysisWarmer
 from backend.ai.reasoning_engine import OperationsReasoningEngine
 from backend.ai.chatbot import AirportChatbot
-from backend.routers import filters, overview, queue, security, trends, chat
+from backend.ai.forecasting import build_forecaster
+from backend.ai.precompute import AnswerPrecomputer
+from backend.routers import filters, overview, queue, security, trends, chat, pages, anomalies, forecast
 
 
 @asynccontextmanager
@@ -19,9 +27,14 @@ async def lifespan(app: FastAPI):
     # Startup: load all data into memory
     print("Loading data...")
     data_loader = DataLoader()
-    data_loader.load_all()
+    if CONFIG["data"].get("eager_load", True):
+        data_loader.load_all()
+        data_loader.derived(build_kpi_rollup)
+        if CONFIG["dashboard"].get("anomaly_detection", {}).get("enabled", False):
+            data_loader.derived(build_anomaly_engine)
+        data_loader.derived(build_forecaster)
 
-    reasoning_engine = OperationsReasoningEngine(data_loader)
+    reasoning_engine = OperationsReasoningEngine(data_loader, CONFIG["ai"].get("analysis_cache_size", 512))
     chatbot = AirportChatbot(reasoning_engine, CONFIG)
 
     app.state.config = CONFIG
@@ -29,16 +42,60 @@ async def lifespan(app: FastAPI):
     app.state.reasoning_engine = reasoning_engine
     app.state.chatbot = chatbot
 
-    print("Data loaded. API ready.")
+    # Analyses for past dates are computed in the background; the API serves meanwhile
+    warmer = AnalysisWarmer(data_loader, reasoning_engine, queue.DEFAULT_ZONE, queue.DEFAULT_TIME_WINDOW)
+    app.state.warmer = warmer
+    if CONFIG["ai"].get("warmup", False):
+        warmer.start()
+
+    # Demo prompts and quick queries are answered ahead of time, and again after each reload
+    precompute_config = CONFIG["ai"].get("precompute", {})
+    precomputer = AnswerPrecomputer(
+        chatbot, data_loader, CONFIG["data"]["report_date"],
+        days=precompute_config.get("days", 3), concurrency=precompute_config.get("concurrency", 4),
+    )
+    app.state.precomputer = precomputer
+    if precompute_config.get("enabled", False):
+        precomputer.start()
+
+    def on_reload(version: int):
+        # A reload starts every per-version cache empty; warm the new snapshot again
+        if CONFIG["ai"].get("warmup", False):
+            warmer.start()
+        if precompute_config.get("enabled", False):
+            precomputer.start()
+
+    reload_config = CONFIG["data"].get("reload", {})
+    watcher = None
+    if reload_config.get("enabled", False):
+        watcher = asyncio.create_task(data_loader.watch(reload_config.get("poll_interval_seconds", 10), on_reload))
+
+    print(f"Data loaded (version {data_loader.version}). API ready.")
     yield
 
+    if watcher is not None:
+        watcher.cancel()
+    warmer.cancel()
+    precomputer.cancel()
+    await chatbot.close()
+
 
 app = FastAPI(
     title="BIAL Airport Operations Dashboard API",
     version="2.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+cache_config = CONFIG.get("api", {}).get("response_cache", {})
+response_cache = ResponseCache(
+    max_entries=cache_config.get("max_entries", 2048),
+    max_bytes=int(cache_config.get("max_mb", 64) * 1024 * 1024),
+)
+if cache_config.get("enabled", True):
+    # Added before CORS so it sits inside it and cached responses still get CORS headers
+    app.add_middleware(ResponseCacheMiddleware, cache=response_cache)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
@@ -47,14 +104,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def pin_data_snapshot(request: Request, call_next):
+    # Each request reads from a single data snapshot even if a reload lands mid-request
+    with request.app.state.data_loader.pinned():
+        return await call_next(request)
+
+
 app.include_router(filters.router)
 app.include_router(overview.router)
 app.include_router(queue.router)
 app.include_router(security.router)
 app.include_router(trends.router)
 app.include_router(chat.router)
+app.include_router(pages.router)
+app.include_router(anomalies.router)
+app.include_router(forecast.router)
 
 
 @app.get("/api/health")
-def health_check():
-    return {"status": "ok", "version": "2.0.0"}
+def health_check(request: Request):
+    return {"status": "ok", "version": "2.0.0", "data_version": request.app.state.data_loader.version}
+
+
+@app.get("/api/health/data")
+def data_health(request: Request):
+    snapshot = request.app.state.data_loader.snapshot()
+    datasets = {name: snapshot.load_stats[name] for name in DATASETS if name in snapshot.load_stats}
+    return {"data_version": snapshot.version, "datasets": datasets}
+
+
+@app.get("/api/health/ready")
+def readiness(request: Request):
+    warmup = request.app.state.warmer.status()
+    return {
+        "ready": warmup["state"] in ("idle", "ready"),
+        "data_version": request.app.state.data_loader.version,
+        "warmup": warmup,
+        "precompute": request.app.state.precomputer.status(),
+    }
+
+
+@app.get("/api/health/cache")
+def cache_health(request: Request):
+    return {
+        **response_cache.stats(),
+        "analyses": request.app.state.reasoning_engine.cache_stats(),
+        "chat_context": request.app.state.chatbot.context_cache_stats(),
+        "chat_responses": request.app.state.chatbot.response_cache_stats(),
+        "forecast_models": request.app.state.data_loader.derived(build_forecaster).models.stats(),
+    }
+
+
+@app.get("/api/health/tokens")
+def token_health(request: Request):
+    return request.app.state.chatbot.token_stats()
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, Request, Query
+from typing import Literal, Optional
+import pandas as pd
+
+from backend.core.anomalies import build_anomaly_engine
+from backend.core.serialization import ORJSONResponse, day, nullable, rounded, text, to_records
+
+router = APIRouter(prefix="/api/anomalies", tags=["anomalies"])
+
+ANOMALY_FIELDS = {
+    "date": day,
+    "kind": text,
+    "entity": text,
+    "slot": text,
+    "value": nullable(rounded(2)),
+    "expected": nullable(rounded(2)),
+    "z_rolling": nullable(rounded(2)),
+    "z_ewma": nullable(rounded(2)),
+    "z_seasonal": nullable(rounded(2)),
+    "score": nullable(rounded(2)),
+}
+
+
+@router.get("")
+def get_anomalies(
+    request: Request,
+    date: str = Query(default=None),
+    kind: Optional[Literal["queue", "security"]] = Query(default=None),
+    min_score: Optional[float] = Query(default=None, description="Defaults to flagged anomalies only"),
+    limit: int = Query(default=50, ge=1, le=1000),
+):
+    config = request.app.state.config
+    if not config["dashboard"].get("anomaly_detection", {}).get("enabled", False):
+        raise HTTPException(status_code=404, detail="Anomaly detection is disabled")
+
+    report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
+    engine = request.app.state.data_loader.derived(build_anomaly_engine)
+    kinds = [kind] if kind else None
+
+    if min_score is None:
+        scores = engine.flagged(report_date, kinds)
+    else:
+        scores = engine.scores(report_date, kinds)
+        scores = scores[scores["score"] >= min_score] if len(scores) else scores
+
+    return ORJSONResponse({
+        "date": report_date.strftime("%Y-%m-%d"),
+        "threshold": engine.threshold,
+        "series": engine.series_counts(),
+        "anomalies": to_records(scores.head(limit), ANOMALY_FIELDS) if len(scores) else [],
+    })
@@ -23,12 +23,21 @@ async def chat_stream(request: Request, body: ChatRequest):
 
     date = datetime.strptime(body.date, "%Y-%m-%d") if body.date else datetime.strptime(config["data"]["report_date"], "%Y-%m-%d")
 
-    def generate():
+    # Demo prompts and quick queries opening a conversation are answered ahead of time
+    precomputed = None if body.conversation_history else request.app.state.precomputer.get(body.query, date)
+
+    async def generate():
+        if precomputed is not None:
+            yield f"data: {json.dumps({'token': precomputed.response})}\n\n"
+            yield f"data: {json.dumps({'done': True, 'full_response': precomputed.response, 'precomputed': True, 'tokens': None})}\n\n"
+            return
+        prompt = await chatbot.build_prompt(body.query, date, body.conversation_history)
         full_response = ""
-        for chunk in chatbot.chat_stream(body.query, date=date, history=body.conversation_history):
+        async for chunk in chatbot.chat_stream(body.query, date=date, prompt=prompt):
             full_response += chunk
             yield f"data: {json.dumps({'token': chunk})}\n\n"
-        yield f"data: {json.dumps({'done': True, 'full_response': full_response})}\n\n"
+        tokens = chatbot.record_usage(prompt, full_response)
+        yield f"data: {json.dumps({'done': True, 'full_response': full_response, 'precomputed': False, 'tokens': tokens})}\n\n"
 
     return StreamingResponse(generate(), media_type="text/event-stream")
 
@@ -40,10 +49,13 @@ async def chat_non_streaming(request: Request, body: ChatRequest):
 
     date = datetime.strptime(body.date, "%Y-%m-%d") if body.date else datetime.strptime(config["data"]["report_date"], "%Y-%m-%d")
 
-    response = chatbot.chat(body.query, date=date, history=body.conversation_history)
-    has_api = chatbot.client is not None
+    precomputed = None if body.conversation_history else request.app.state.precomputer.get(body.query, date)
+    if precomputed is not None:
+        return {"response": precomputed.response, "mode": precomputed.mode, "precomputed": True, "tokens": None}
 
-    return {"response": response, "mode": "openai" if has_api else "fallback"}
+    prompt = await chatbot.build_prompt(body.query, date, body.conversation_history)
+    response, mode = await chatbot.answer(body.query, date, prompt=prompt)
+    return {"response": response, "mode": mode, "precomputed": False, "tokens": chatbot.record_usage(prompt, response)}
 
 
 @router.get("/demo-prompts")
@@ -0,0 +1,145 @@
+from fastapi import APIRouter, Request, Query
+import numpy as np
+import pandas as pd
+
+from backend.ai.forecasting import build_forecaster
+from backend.core.serialization import ORJSONResponse, TableFormat, arrow_response, day, integer, nullable, rounded, text, to_table
+
+router = APIRouter(prefix="/api/forecast", tags=["forecast"])
+
+VALUE_FIELDS = {
+    "forecast": rounded(1),
+    "lower": rounded(1),
+    "upper": rounded(1),
+    "actual": nullable(rounded(1)),
+}
+
+
+SUMMARY_FIELDS = [
+    "peak_hour", "peak_pax", "total_pax", "actual_peak_hour", "actual_peak_pax", "actual_total_pax",
+    "avg_compliance", "zone_hours_below_target", "actual_avg_compliance",
+    "atm_total", "actual_atm_total",
+]
+
+
+def _origin(request: Request, date: str) -> pd.Timestamp:
+    config = request.app.state.config
+    return pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
+
+
+def _fit_mape(model):
+    return round(model.mape, 1) if model is not None and not np.isnan(model.mape) else None
+
+
+def _total(values: pd.Series):
+    # Actuals are only summed when every series reported, otherwise the day is not comparable
+    return float(values.sum()) if values.notna().all() else None
+
+
+def _forecast_table(request: Request, name: str, date: str, days: int, format: TableFormat):
+    forecaster = request.app.state.data_loader.derived(build_forecaster)
+    origin = _origin(request, date)
+    series = forecaster.series[name]
+    predicted = forecaster.predict(name, origin, days)
+
+    fields = {key: text for key in series.keys}
+    fields["date"] = day
+    if series.hourly:
+        fields["hour"] = integer
+    fields.update(VALUE_FIELDS)
+    if format == "arrow":
+        return arrow_response(predicted, fields)
+
+    model = forecaster.model(name, origin)
+    return ORJSONResponse({
+        "origin": origin.strftime("%Y-%m-%d"),
+        "days": days,
+        "fit_mape": _fit_mape(model),
+        "data": to_table(predicted, fields, format),
+    })
+
+
+@router.get("/pax")
+def get_pax_forecast(request: Request, date: str = Query(default=None), days: int = Query(default=1, ge=1, le=14), format: TableFormat = "records"):
+    """Hourly show-ups per terminal and passenger type for the `days` after `date`."""
+    return _forecast_table(request, "pax", date, days, format)
+
+
+@router.get("/queue")
+def get_queue_forecast(request: Request, date: str = Query(default=None), days: int = Query(default=1, ge=1, le=14), format: TableFormat = "records"):
+    """Hourly queue compliance per zone for the `days` after `date`."""
+    return _forecast_table(request, "queue", date, days, format)
+
+
+@router.get("/atm")
+def get_atm_forecast(request: Request, date: str = Query(default=None), days: int = Query(default=7, ge=1, le=14), format: TableFormat = "records"):
+    """Daily air traffic movements per terminal, flow and type for the `days` after `date`."""
+    return _forecast_table(request, "atm", date, days, format)
+
+
+@router.get("/summary")
+def get_forecast_summary(request: Request, date: str = Query(default=None), days: int = Query(default=1, ge=1, le=14)):
+    """Headline numbers per forecast day: peak-hour and total pax, compliance and ATMs."""
+    forecaster = request.app.state.data_loader.derived(build_forecaster)
+    origin = _origin(request, date)
+
+    pax = forecaster.predict("pax", origin, days)
+    queue = forecaster.predict("queue", origin, days)
+    atm = forecaster.predict("atm", origin, days)
+
+    summary = []
+    for forecast_date in pd.date_range(origin + pd.Timedelta(days=1), periods=days):
+        hourly = pax[pax["date"] == forecast_date].groupby("hour").agg(
+            forecast=("forecast", "sum"), actual=("actual", _total),
+        )
+        compliance = queue.loc[queue["date"] == forecast_date, ["forecast", "actual"]]
+        movements = atm.loc[atm["date"] == forecast_date, ["forecast", "actual"]]
+        # Every day has the same fields; those of a family without a forecast are None
+        entry = {"date": forecast_date.strftime("%Y-%m-%d"), **dict.fromkeys(SUMMARY_FIELDS)}
+        if len(hourly):
+            peak = hourly["forecast"].idxmax()
+            actual = hourly["actual"].astype(float)
+            complete = actual.notna().all()
+            entry.update({
+                "peak_hour": int(peak),
+                "peak_pax": int(round(hourly.loc[peak, "forecast"])),
+                "total_pax": int(round(hourly["forecast"].sum())),
+                "actual_peak_hour": int(actual.idxmax()) if complete else None,
+                "actual_peak_pax": int(round(actual.max())) if complete else None,
+                "actual_total_pax": int(round(actual.sum())) if complete else None,
+            })
+        if len(compliance):
+            actual = compliance["actual"]
+            entry.update({
+                "avg_compliance": round(float(compliance["forecast"].mean()), 1),
+                "zone_hours_below_target": int((compliance["forecast"] < 95).sum()),
+                "actual_avg_compliance": round(float(actual.mean()), 1) if actual.notna().all() else None,
+            })
+        if len(movements):
+            actual = _total(movements["actual"])
+            entry.update({
+                "atm_total": int(round(movements["forecast"].sum())),
+                "actual_atm_total": int(round(actual)) if actual is not None else None,
+            })
+        summary.append(entry)
+
+    return ORJSONResponse({"origin": origin.strftime("%Y-%m-%d"), "days": days, "summary": summary})
+
+
+@router.get("/models")
+def get_forecast_models(request: Request, date: str = Query(default=None)):
+    """Series counts and in-sample fit error of the models fit for `date`."""
+    forecaster = request.app.state.data_loader.derived(build_forecaster)
+    origin = _origin(request, date)
+    models = {}
+    for name, series in forecaster.series.items():
+        fit = forecaster.fit(name, origin)
+        models[name] = {
+            "dataset": series.dataset,
+            "metric": series.metric,
+            "hourly": series.hourly,
+            "series": len(fit.series) if fit is not None else 0,
+            "fit_mape": _fit_mape(fit.model if fit is not None else None),
+        }
+    # Model cache stats change between requests, so they live under /api/health/cache
+    return ORJSONResponse({"origin": origin.strftime("%Y-%m-%d"), "history_days": forecaster.history_days, "models": models})
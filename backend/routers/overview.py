@@ -1,9 +1,16 @@
 from fastapi import APIRouter, Request, Query
 from datetime import datetime, timedelta
+from typing import Literal
 import pandas as pd
 
+from backend.core.anomalies import build_anomaly_engine
+from backend.core.rollups import build_kpi_rollup
+from backend.core.serialization import ORJSONResponse, day, integer, rounded, text, to_records
+
 router = APIRouter(prefix="/api/overview", tags=["overview"])
 
+PERIOD_DAYS = {"week": 7, "month": 30}
+
 
 @router.get("/kpis")
 def get_kpis(request: Request, date: str = Query(default=None), terminals: str = Query(default="T1,T2")):
@@ -14,39 +21,25 @@ def get_kpis(request: Request, date: str = Query(default=None), terminals: str =
     report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
     terminal_list = terminals.split(",")
 
-    pax_data = dl.load_passenger_data()
-    daily_pax = pax_data["daily"]
-    report_pax = daily_pax[(daily_pax["date"] == report_date) & (daily_pax["terminal"].isin(terminal_list))]
-
-    total_pax = int(report_pax["pax_count"].sum())
-    domestic_pax = int(report_pax[report_pax["passenger_type"] == "Domestic"]["pax_count"].sum())
-    intl_pax = int(report_pax[report_pax["passenger_type"] == "International"]["pax_count"].sum())
-    pax_vs_7day = round(float(report_pax["pax_count_vs_7day_pct"].mean()), 1) if "pax_count_vs_7day_pct" in report_pax.columns and len(report_pax) > 0 else 0.0
-
-    queue_data = dl.load_queue_data()
-    zone_compliance = queue_data["zone_compliance"]
-    report_compliance = zone_compliance[(zone_compliance["date"] == report_date) & (zone_compliance["terminal"].isin(terminal_list))]
-    avg_compliance = round(float(report_compliance["actual_compliance_pct"].mean()), 1) if len(report_compliance) > 0 else 0
-
-    security_data = dl.load_security_data()
-    security_daily = security_data["daily"]
-    report_security = security_daily[(security_daily["date"] == report_date) & (security_daily["terminal"].isin(terminal_list))]
-    avg_reject = round(float(report_security["reject_rate_pct"].mean()), 1) if len(report_security) > 0 else 0
-
-    voc_data = dl.load_voc_data()
-    voc_feedback = voc_data["feedback"]
-    report_voc = voc_feedback[(voc_feedback["date"] == report_date) & (voc_feedback["terminal"].isin(terminal_list))]
-    total_complaints = int(report_voc["complaints"].sum()) if len(report_voc) > 0 else 0
-    total_compliments = int(report_voc["compliments"].sum()) if len(report_voc) > 0 else 0
+    # Every KPI is a sum over a few precomputed (date, terminal) rows of the rollup; means come rounded
+    kpis = dl.derived(build_kpi_rollup).totals(report_date, terminal_list)
+
+    total_pax = int(kpis["pax_total"])
+    domestic_pax = int(kpis["pax_domestic"])
+    intl_pax = int(kpis["pax_international"])
+    pax_vs_7day = kpis["pax_vs_7day"] if kpis["pax_vs_7day_n"] > 0 else 0.0
+
+    avg_compliance = kpis["compliance"] if kpis["compliance_n"] > 0 else 0
+
+    avg_reject = kpis["reject"] if kpis["reject_n"] > 0 else 0
+
+    total_complaints = int(kpis["complaints"])
+    total_compliments = int(kpis["compliments"])
     voc_ratio = round(total_compliments / total_complaints, 2) if total_complaints > 0 else 0
 
-    biometric_data = dl.load_biometric_data()
-    report_bio = biometric_data[(biometric_data["date"] == report_date) & (biometric_data["terminal"].isin(terminal_list))]
     bio_adoption = 0.0
-    if len(report_bio) > 0 and "total_eligible_pax" in report_bio.columns:
-        total_eligible = report_bio["total_eligible_pax"].sum()
-        total_registered = report_bio["biometric_registrations"].sum()
-        bio_adoption = round(float(total_registered / total_eligible * 100), 1) if total_eligible > 0 else 0.0
+    if kpis["bio_eligible"] > 0:
+        bio_adoption = round(kpis["bio_registrations"] / kpis["bio_eligible"] * 100, 1)
 
     return {
         "total_pax": total_pax,
@@ -123,6 +116,16 @@ def get_executive_summary(request: Request, date: str = Query(default=None)):
     }
 
 
+@router.get("/period-summary")
+def get_period_summary(request: Request, period: Literal["week", "month"] = "week", end_date: str = Query(default=None)):
+    engine = request.app.state.reasoning_engine
+    config = request.app.state.config
+    end = datetime.strptime(end_date, "%Y-%m-%d") if end_date else datetime.strptime(config["data"]["report_date"], "%Y-%m-%d")
+    start = end - timedelta(days=PERIOD_DAYS[period] - 1)
+
+    return {"period": period, **engine.generate_period_summary(start, end)}
+
+
 @router.get("/pax-trend")
 def get_pax_trend(request: Request, days: int = 15, end_date: str = Query(default=None)):
     dl = request.app.state.data_loader
@@ -130,11 +133,10 @@ def get_pax_trend(request: Request, days: int = 15, end_date: str = Query(defaul
     end = pd.to_datetime(end_date) if end_date else pd.to_datetime(config["data"]["report_date"])
     start = end - timedelta(days=days - 1)
 
-    daily_pax = dl.load_passenger_data()["daily"]
-    trend = daily_pax[(daily_pax["date"] >= start) & (daily_pax["date"] <= end)]
+    trend = dl.range("pax_daily_volumes", start, end)
     trend_agg = trend.groupby("date")["pax_count"].sum().reset_index()
 
-    return {"data": [{"date": row["date"].strftime("%Y-%m-%d"), "pax_count": int(row["pax_count"])} for _, row in trend_agg.iterrows()]}
+    return ORJSONResponse({"data": to_records(trend_agg, {"date": day, "pax_count": integer})})
 
 
 @router.get("/atm-trend")
@@ -144,11 +146,10 @@ def get_atm_trend(request: Request, days: int = 15, end_date: str = Query(defaul
     end = pd.to_datetime(end_date) if end_date else pd.to_datetime(config["data"]["report_date"])
     start = end - timedelta(days=days - 1)
 
-    atm_data = dl.load_atm_data()
-    trend = atm_data[(atm_data["date"] >= start) & (atm_data["date"] <= end)]
+    trend = dl.range("atm_daily", start, end)
     trend_agg = trend.groupby("date")["atm_count"].sum().reset_index()
 
-    return {"data": [{"date": row["date"].strftime("%Y-%m-%d"), "atm_count": int(row["atm_count"])} for _, row in trend_agg.iterrows()]}
+    return ORJSONResponse({"data": to_records(trend_agg, {"date": day, "atm_count": integer})})
 
 
 @router.get("/terminal-breakdown")
@@ -157,11 +158,10 @@ def get_terminal_breakdown(request: Request, date: str = Query(default=None)):
     config = request.app.state.config
     report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
 
-    daily_pax = dl.load_passenger_data()["daily"]
-    report_pax = daily_pax[daily_pax["date"] == report_date]
-    breakdown = report_pax.groupby(["terminal", "flow"])["pax_count"].sum().reset_index()
+    report_pax = dl.slice("pax_daily_volumes", report_date)
+    breakdown = report_pax.groupby(["terminal", "flow"], observed=True)["pax_count"].sum().reset_index()
 
-    return {"data": [{"terminal": row["terminal"], "flow": row["flow"], "pax_count": int(row["pax_count"])} for _, row in breakdown.iterrows()]}
+    return ORJSONResponse({"data": to_records(breakdown, {"terminal": text, "flow": text, "pax_count": integer})})
 
 
 @router.get("/zone-compliance-summary")
@@ -170,12 +170,11 @@ def get_zone_compliance_summary(request: Request, date: str = Query(default=None
     config = request.app.state.config
     report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
 
-    zone_compliance = dl.load_queue_data()["zone_compliance"]
-    report = zone_compliance[zone_compliance["date"] == report_date]
-    summary = report.groupby("zone")["actual_compliance_pct"].mean().reset_index()
+    report = dl.slice("queue_zone_compliance", report_date)
+    summary = report.groupby("zone", observed=True)["actual_compliance_pct"].mean().reset_index()
     summary = summary.sort_values("actual_compliance_pct")
 
-    return {"data": [{"zone": row["zone"], "actual_compliance_pct": round(float(row["actual_compliance_pct"]), 1)} for _, row in summary.iterrows()]}
+    return ORJSONResponse({"data": to_records(summary, {"zone": text, "actual_compliance_pct": rounded(1)})})
 
 
 @router.get("/alerts")
@@ -184,31 +183,43 @@ def get_alerts(request: Request, date: str = Query(default=None)):
     config = request.app.state.config
     report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
 
-    zone_compliance = dl.load_queue_data()["zone_compliance"]
-    report = zone_compliance[zone_compliance["date"] == report_date]
+    report = dl.slice("queue_zone_compliance", report_date)
     below_target = report[report["actual_compliance_pct"] < 95].sort_values("actual_compliance_pct").head(5)
 
-    queue_alerts = []
-    for _, row in below_target.iterrows():
-        queue_alerts.append({
-            "zone": row["zone"],
-            "time_window": row["time_window"],
-            "compliance": round(float(row["actual_compliance_pct"]), 1),
-            "pax_affected": int(row["pax_total"]),
-            "variance": round(float(row["variance_from_target"]), 1),
-        })
-
-    security_daily = dl.load_security_data()["daily"]
-    report_security = security_daily[security_daily["date"] == report_date]
-    high_reject = report_security[report_security["reject_rate_pct"] > 8].sort_values("reject_rate_pct", ascending=False)
+    queue_alerts = to_records(below_target, {
+        "zone": text,
+        "time_window": text,
+        "compliance": ("actual_compliance_pct", rounded(1)),
+        "pax_affected": ("pax_total", integer),
+        "variance": ("variance_from_target", rounded(1)),
+    })
 
-    security_alerts = []
-    for _, row in high_reject.iterrows():
-        security_alerts.append({
-            "lane": row["lane"],
-            "terminal": row["terminal"],
-            "reject_rate": round(float(row["reject_rate_pct"]), 1),
-            "reject_count": int(row["reject_count"]),
-        })
+    report_security = dl.slice("security_lanes_daily", report_date)
+    high_reject = report_security[report_security["reject_rate_pct"] > 8].sort_values("reject_rate_pct", ascending=False)
 
-    return {"queue_alerts": queue_alerts, "security_alerts": security_alerts}
+    security_alerts = to_records(high_reject, {
+        "lane": text,
+        "terminal": text,
+        "reject_rate": ("reject_rate_pct", rounded(1)),
+        "reject_count": integer,
+    })
+
+    # Observations far outside their own zone/lane baseline, even when above the fixed thresholds
+    statistical_alerts = []
+    if config["dashboard"].get("anomaly_detection", {}).get("enabled", False):
+        flagged = dl.derived(build_anomaly_engine).flagged(report_date).head(5)
+        if len(flagged):
+            statistical_alerts = to_records(flagged, {
+                "kind": text,
+                "entity": text,
+                "slot": text,
+                "value": rounded(1),
+                "expected": rounded(1),
+                "score": rounded(2),
+            })
+
+    return ORJSONResponse({
+        "queue_alerts": queue_alerts,
+        "security_alerts": security_alerts,
+        "statistical_alerts": statistical_alerts,
+    })
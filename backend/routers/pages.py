@@ -0,0 +1,126 @@
+import inspect
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pydantic.fields import FieldInfo
+
+from backend.core.serialization import ORJSONResponse, fragment
+from backend.routers import overview, queue, security, trends
+
+router = APIRouter(prefix="/api", tags=["pages"])
+
+# Every GET endpoint of the dashboard routers, addressed by its path below /api
+WIDGETS: Dict[str, Callable] = {
+    route.path[len("/api/"):]: route.endpoint
+    for module in (overview, queue, security, trends)
+    for route in module.router.routes
+    if "GET" in route.methods
+}
+
+
+class WidgetSpec(BaseModel):
+    widget: str
+    id: Optional[str] = None
+    params: Dict[str, Any] = {}
+
+
+class BatchRequest(BaseModel):
+    widgets: List[WidgetSpec]
+    params: Dict[str, Any] = {}
+
+
+# The widgets each dashboard page renders on load
+PAGES: Dict[str, List[WidgetSpec]] = {
+    "overview": [
+        WidgetSpec(id="kpis", widget="overview/kpis"),
+        WidgetSpec(id="executive-summary", widget="overview/executive-summary"),
+        WidgetSpec(id="pax-trend", widget="overview/pax-trend"),
+        WidgetSpec(id="atm-trend", widget="overview/atm-trend"),
+        WidgetSpec(id="terminal-breakdown", widget="overview/terminal-breakdown"),
+        WidgetSpec(id="zone-compliance-summary", widget="overview/zone-compliance-summary"),
+        WidgetSpec(id="alerts", widget="overview/alerts"),
+    ],
+    "queue": [
+        WidgetSpec(id="status", widget="queue/status"),
+        WidgetSpec(id="zones", widget="queue/zones"),
+        WidgetSpec(id="heatmap", widget="queue/heatmap"),
+        WidgetSpec(id="table", widget="queue/table"),
+    ],
+    "security": [
+        WidgetSpec(id="summary", widget="security/summary"),
+        WidgetSpec(id="lanes", widget="security/lanes"),
+        WidgetSpec(id="high-reject", widget="security/high-reject"),
+        WidgetSpec(id="baggage", widget="security/baggage"),
+        WidgetSpec(id="gates", widget="security/gates"),
+    ],
+    "trends": [
+        WidgetSpec(id="passenger-by-type", widget="trends/passenger", params={"group_by": "passenger_type"}),
+        WidgetSpec(id="passenger-by-terminal", widget="trends/passenger", params={"group_by": "terminal"}),
+        WidgetSpec(id="biometric", widget="trends/biometric"),
+        WidgetSpec(id="voc", widget="trends/voc"),
+    ],
+}
+
+
+@lru_cache(maxsize=None)
+def _adapter(annotation) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def _call_widget(request: Request, widget: str, params: Dict[str, Any]) -> Any:
+    endpoint = WIDGETS.get(widget)
+    if endpoint is None:
+        raise HTTPException(status_code=404, detail=f"Unknown widget '{widget}'")
+
+    kwargs = {}
+    for name, param in inspect.signature(endpoint).parameters.items():
+        if name == "request":
+            kwargs[name] = request
+        elif params.get(name) is not None:
+            try:
+                kwargs[name] = _adapter(param.annotation).validate_python(params[name])
+            except ValidationError as e:
+                raise RequestValidationError([{**error, "loc": (widget, name)} for error in e.errors()])
+        else:
+            kwargs[name] = param.default.default if isinstance(param.default, FieldInfo) else param.default
+
+    result = endpoint(**kwargs)
+    if isinstance(result, Response):
+        if result.media_type != "application/json":
+            raise HTTPException(status_code=422, detail=f"Widget '{widget}' does not return JSON with these params")
+        return fragment(result.body)
+    return jsonable_encoder(result)
+
+
+def _run_batch(request: Request, widgets: List[WidgetSpec], shared: Dict[str, Any]) -> ORJSONResponse:
+    ids = [spec.id or spec.widget for spec in widgets]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=422, detail="Widget ids must be unique")
+
+    # Trend widgets take the page date as their end_date
+    if "date" in shared and "end_date" not in shared:
+        shared = {**shared, "end_date": shared["date"]}
+
+    dl = request.app.state.data_loader
+    results = {}
+    with dl.shared_slices():
+        for widget_id, spec in zip(ids, widgets):
+            results[widget_id] = _call_widget(request, spec.widget, {**shared, **spec.params})
+    return ORJSONResponse(results)
+
+
+@router.post("/batch")
+def batch(request: Request, body: BatchRequest):
+    return _run_batch(request, body.widgets, body.params)
+
+
+@router.get("/pages/{page}")
+def get_page(request: Request, page: str):
+    if page not in PAGES:
+        raise HTTPException(status_code=404, detail=f"Unknown page '{page}'")
+    return _run_batch(request, PAGES[page], dict(request.query_params))
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Request, Query
+from fastapi import APIRouter, HTTPException, Request, Query
 from datetime import datetime
 import pandas as pd
 import numpy as np
 
+from backend.core.serialization import ORJSONResponse, TableFormat, arrow_response, integer, rounded, text, to_records, to_table
+
 router = APIRouter(prefix="/api/queue", tags=["queue"])
 
+DEFAULT_ZONE = "Check-in 34-86"
+DEFAULT_TIME_WINDOW = "1400-1600"
+
 
 @router.get("/status")
 def get_queue_status(request: Request, date: str = Query(default=None)):
@@ -12,12 +17,11 @@ def get_queue_status(request: Request, date: str = Query(default=None)):
     config = request.app.state.config
     report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
 
-    zone_compliance = dl.load_queue_data()["zone_compliance"]
-    report = zone_compliance[zone_compliance["date"] == report_date]
+    report = dl.slice("queue_zone_compliance", report_date)
 
     overall = round(float(report["actual_compliance_pct"].mean()), 1)
     total_zones = int(report["zone"].nunique())
-    zones_below = int(len(report.groupby("zone")["actual_compliance_pct"].mean().reset_index().query("actual_compliance_pct < 95")))
+    zones_below = int(len(report.groupby("zone", observed=True)["actual_compliance_pct"].mean().reset_index().query("actual_compliance_pct < 95")))
     pax_affected = int(report[report["actual_compliance_pct"] < 95]["pax_total"].sum())
     target_achievement = round((total_zones - zones_below) / total_zones * 100, 0) if total_zones > 0 else 100
 
@@ -36,30 +40,31 @@ def get_zones(request: Request, date: str = Query(default=None)):
     config = request.app.state.config
     report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
 
-    zone_compliance = dl.load_queue_data()["zone_compliance"]
-    report = zone_compliance[zone_compliance["date"] == report_date]
+    report = dl.slice("queue_zone_compliance", report_date)
     zones = sorted(report["zone"].unique().tolist())
     return {"zones": zones}
 
 
 @router.get("/root-cause")
-def get_root_cause(request: Request, date: str = Query(default=None), zone: str = "Check-in 34-86", time_window: str = "1400-1600"):
+def get_root_cause(request: Request, date: str = Query(default=None), zone: str = DEFAULT_ZONE, time_window: str = DEFAULT_TIME_WINDOW):
     engine = request.app.state.reasoning_engine
     config = request.app.state.config
     report_date = datetime.strptime(date, "%Y-%m-%d") if date else datetime.strptime(config["data"]["report_date"], "%Y-%m-%d")
 
-    result = engine.generate_root_cause_analysis(report_date, zone, time_window)
-    return result
+    try:
+        return engine.generate_root_cause_analysis(report_date, zone, time_window)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
 
 @router.get("/zone-detail")
-def get_zone_detail(request: Request, date: str = Query(default=None), zone: str = Query(default="Check-in 34-86")):
+def get_zone_detail(request: Request, date: str = Query(default=None), zone: str = Query(default=DEFAULT_ZONE)):
     dl = request.app.state.data_loader
     config = request.app.state.config
     report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
 
-    zone_compliance = dl.load_queue_data()["zone_compliance"]
-    report = zone_compliance[(zone_compliance["date"] == report_date) & (zone_compliance["zone"] == zone)]
+    report = dl.slice("queue_zone_compliance", report_date)
+    report = report[report["zone"] == zone]
 
     if len(report) == 0:
         return {"zone": zone, "avg_compliance": 0, "threshold_minutes": 0, "total_pax": 0, "avg_wait_time": 0, "time_series": []}
@@ -69,23 +74,21 @@ def get_zone_detail(request: Request, date: str = Query(default=None), zone: str
     total_pax = int(report["pax_total"].sum())
     avg_wait = round(float(report["avg_wait_time_min"].mean()), 1)
 
-    time_series = []
-    for _, row in report.iterrows():
-        time_series.append({
-            "time_window": row["time_window"],
-            "actual_compliance_pct": round(float(row["actual_compliance_pct"]), 1),
-            "pax_total": int(row["pax_total"]),
-            "avg_wait_time_min": round(float(row["avg_wait_time_min"]), 1),
-        })
+    time_series = to_records(report, {
+        "time_window": text,
+        "actual_compliance_pct": rounded(1),
+        "pax_total": integer,
+        "avg_wait_time_min": rounded(1),
+    })
 
-    return {
+    return ORJSONResponse({
         "zone": zone,
         "avg_compliance": avg_compliance,
         "threshold_minutes": threshold,
         "total_pax": total_pax,
         "avg_wait_time": avg_wait,
         "time_series": time_series,
-    }
+    })
 
 
 @router.get("/heatmap")
@@ -94,10 +97,9 @@ def get_heatmap(request: Request, date: str = Query(default=None)):
     config = request.app.state.config
     report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
 
-    zone_compliance = dl.load_queue_data()["zone_compliance"]
-    report = zone_compliance[zone_compliance["date"] == report_date]
+    report = dl.slice("queue_zone_compliance", report_date)
 
-    pivot = report.pivot_table(index="zone", columns="time_window", values="actual_compliance_pct", aggfunc="mean")
+    pivot = report.pivot_table(index="zone", columns="time_window", values="actual_compliance_pct", aggfunc="mean", observed=True)
 
     zones = pivot.index.tolist()
     time_windows = pivot.columns.tolist()
@@ -107,31 +109,31 @@ def get_heatmap(request: Request, date: str = Query(default=None)):
 
 
 @router.get("/table")
-def get_table(request: Request, date: str = Query(default=None), terminals: str = Query(default="T1,T2"), violations_only: bool = False):
+def get_table(request: Request, date: str = Query(default=None), terminals: str = Query(default="T1,T2"), violations_only: bool = False, format: TableFormat = "records"):
     dl = request.app.state.data_loader
     config = request.app.state.config
     report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
     terminal_list = terminals.split(",")
 
-    zone_compliance = dl.load_queue_data()["zone_compliance"]
-    report = zone_compliance[(zone_compliance["date"] == report_date) & (zone_compliance["terminal"].isin(terminal_list))]
+    report = dl.slice("queue_zone_compliance", report_date)
+    report = report[report["terminal"].isin(terminal_list)]
 
     if violations_only:
         report = report[report["actual_compliance_pct"] < 95]
 
     report = report.sort_values("actual_compliance_pct")
 
-    data = []
-    for _, row in report.iterrows():
-        data.append({
-            "zone": row["zone"],
-            "terminal": row["terminal"],
-            "time_window": row["time_window"],
-            "actual_compliance_pct": round(float(row["actual_compliance_pct"]), 1),
-            "target_compliance_pct": round(float(row["target_compliance_pct"]), 1),
-            "variance_from_target": round(float(row["variance_from_target"]), 1),
-            "pax_total": int(row["pax_total"]),
-            "avg_wait_time_min": round(float(row["avg_wait_time_min"]), 1),
-        })
-
-    return {"data": data}
+    fields = {
+        "zone": text,
+        "terminal": text,
+        "time_window": text,
+        "actual_compliance_pct": rounded(1),
+        "target_compliance_pct": rounded(1),
+        "variance_from_target": rounded(1),
+        "pax_total": integer,
+        "avg_wait_time_min": rounded(1),
+    }
+    if format == "arrow":
+        return arrow_response(report, fields)
+
+    return ORJSONResponse({"data": to_table(report, fields, format)})
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Request, Query
 import pandas as pd
 
+from backend.core.serialization import ORJSONResponse, TableFormat, arrow_response, integer, rounded, text, to_records, to_table
+
 router = APIRouter(prefix="/api/security", tags=["security"])
 
 
@@ -10,8 +12,7 @@ def get_security_summary(request: Request, date: str = Query(default=None)):
     config = request.app.state.config
     report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
 
-    security_daily = dl.load_security_data()["daily"]
-    report = security_daily[security_daily["date"] == report_date]
+    report = dl.slice("security_lanes_daily", report_date)
 
     return {
         "total_cleared": int(report["cleared_volume"].sum()),
@@ -21,28 +22,35 @@ def get_security_summary(request: Request, date: str = Query(default=None)):
 
 
 @router.get("/lanes")
-def get_lanes(request: Request, date: str = Query(default=None)):
+def get_lanes(request: Request, date: str = Query(default=None), format: TableFormat = "records"):
     dl = request.app.state.data_loader
     config = request.app.state.config
     report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
 
-    security_daily = dl.load_security_data()["daily"]
-    report = security_daily[security_daily["date"] == report_date].sort_values("cleared_volume", ascending=False)
-
-    data = []
-    for _, row in report.iterrows():
-        data.append({
-            "lane": row["lane"],
-            "terminal": row["terminal"],
-            "lane_group": row.get("lane_group", ""),
-            "cleared_volume": int(row["cleared_volume"]),
-            "reject_count": int(row["reject_count"]),
-            "reject_rate_pct": round(float(row["reject_rate_pct"]), 1),
-            "total_scanned": int(row.get("total_scanned", row["cleared_volume"] + row["reject_count"])),
-            "avg_throughput_per_hour": round(float(row.get("avg_throughput_per_hour", 0)), 1),
-        })
+    report = dl.slice("security_lanes_daily", report_date).sort_values("cleared_volume", ascending=False)
+
+    # Older extracts lack the derived lane columns
+    if "lane_group" not in report.columns:
+        report = report.assign(lane_group="")
+    if "total_scanned" not in report.columns:
+        report = report.assign(total_scanned=report["cleared_volume"] + report["reject_count"])
+    if "avg_throughput_per_hour" not in report.columns:
+        report = report.assign(avg_throughput_per_hour=0.0)
+
+    fields = {
+        "lane": text,
+        "terminal": text,
+        "lane_group": text,
+        "cleared_volume": integer,
+        "reject_count": integer,
+        "reject_rate_pct": rounded(1),
+        "total_scanned": integer,
+        "avg_throughput_per_hour": rounded(1),
+    }
+    if format == "arrow":
+        return arrow_response(report, fields)
 
-    return {"data": data}
+    return ORJSONResponse({"data": to_table(report, fields, format)})
 
 
 @router.get("/high-reject")
@@ -51,21 +59,18 @@ def get_high_reject(request: Request, date: str = Query(default=None), threshold
     config = request.app.state.config
     report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
 
-    security_daily = dl.load_security_data()["daily"]
-    report = security_daily[security_daily["date"] == report_date]
+    report = dl.slice("security_lanes_daily", report_date)
     high = report[report["reject_rate_pct"] > threshold].sort_values("reject_rate_pct", ascending=False)
 
-    lanes = []
-    for _, row in high.iterrows():
-        lanes.append({
-            "lane": row["lane"],
-            "terminal": row["terminal"],
-            "reject_rate_pct": round(float(row["reject_rate_pct"]), 1),
-            "reject_count": int(row["reject_count"]),
-            "cleared_volume": int(row["cleared_volume"]),
-        })
+    lanes = to_records(high, {
+        "lane": text,
+        "terminal": text,
+        "reject_rate_pct": rounded(1),
+        "reject_count": integer,
+        "cleared_volume": integer,
+    })
 
-    return {"lanes": lanes}
+    return ORJSONResponse({"lanes": lanes})
 
 
 @router.get("/baggage")
@@ -74,8 +79,7 @@ def get_baggage(request: Request, date: str = Query(default=None)):
     config = request.app.state.config
     report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
 
-    baggage_data = dl.load_baggage_data()
-    report = baggage_data[baggage_data["date"] == report_date]
+    report = dl.slice("baggage_utilization", report_date)
 
     summary = {
         "total_flights": int(report["flights"].sum()),
@@ -83,17 +87,15 @@ def get_baggage(request: Request, date: str = Query(default=None)):
         "avg_pax_per_flight": round(float(report["pax_per_flight"].mean()), 0) if len(report) > 0 else 0,
     }
 
-    belts = []
-    for _, row in report.iterrows():
-        belts.append({
-            "belt": row["belt"],
-            "belt_type": row["belt_type"],
-            "utilization_pct": round(float(row["utilization_pct"]), 1),
-            "flights": int(row["flights"]),
-            "pax": int(row["pax"]),
-        })
+    belts = to_records(report, {
+        "belt": text,
+        "belt_type": text,
+        "utilization_pct": rounded(1),
+        "flights": integer,
+        "pax": integer,
+    })
 
-    return {"summary": summary, "belts": belts}
+    return ORJSONResponse({"summary": summary, "belts": belts})
 
 
 @router.get("/gates")
@@ -102,33 +104,28 @@ def get_gates(request: Request, date: str = Query(default=None)):
     config = request.app.state.config
     report_date = pd.to_datetime(date) if date else pd.to_datetime(config["data"]["report_date"])
 
-    gate_data = dl.load_gate_data()
-    report = gate_data[gate_data["date"] == report_date]
+    report = dl.slice("gate_utilization", report_date)
 
     boarding_mix = {}
-    mix_df = report.groupby(["terminal", "boarding_mode"]).agg({"flights": "sum", "pax": "sum"}).reset_index()
+    mix_df = report.groupby(["terminal", "boarding_mode"], observed=True).agg({"flights": "sum", "pax": "sum"}).reset_index()
     for terminal in ["T1", "T2"]:
         t_data = mix_df[mix_df["terminal"] == terminal]
         total_pax = t_data["pax"].sum()
-        entries = []
-        for _, row in t_data.iterrows():
-            entries.append({
-                "boarding_mode": row["boarding_mode"],
-                "flights": int(row["flights"]),
-                "pax": int(row["pax"]),
-                "pax_pct": round(float(row["pax"] / total_pax * 100), 1) if total_pax > 0 else 0,
-            })
-        boarding_mix[terminal] = entries
-
-    gates = []
-    for _, row in report.sort_values("pax", ascending=False).iterrows():
-        gates.append({
-            "gate": row["gate"],
-            "terminal": row["terminal"],
-            "boarding_mode": row["boarding_mode"],
-            "flights": int(row["flights"]),
-            "pax": int(row["pax"]),
-            "pax_per_flight": round(float(row["pax_per_flight"]), 0),
+        t_data = t_data.assign(pax_pct=t_data["pax"] / total_pax * 100 if total_pax > 0 else 0)
+        boarding_mix[terminal] = to_records(t_data, {
+            "boarding_mode": text,
+            "flights": integer,
+            "pax": integer,
+            "pax_pct": rounded(1) if total_pax > 0 else integer,
         })
 
-    return {"boarding_mix": boarding_mix, "gates": gates}
+    gates = to_records(report.sort_values("pax", ascending=False), {
+        "gate": text,
+        "terminal": text,
+        "boarding_mode": text,
+        "flights": integer,
+        "pax": integer,
+        "pax_per_flight": rounded(0),
+    })
+
+    return ORJSONResponse({"boarding_mix": boarding_mix, "gates": gates})
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from backend.ai.chat_cache import ChatResponseCache
+
+
+async def _slow_answer(started: asyncio.Event):
+    yield "first "
+    started.set()
+    # An upstream call that only ends when cancelled
+    await asyncio.Event().wait()
+    yield "never"
+
+
+async def _collect(stream):
+    return [token async for token in stream]
+
+
+def test_cancelled_flight_releases_every_subscriber():
+    async def scenario():
+        cache = ChatResponseCache()
+        started = asyncio.Event()
+        subscribers = [asyncio.create_task(_collect(cache.stream("key", lambda: _slow_answer(started)))) for _ in range(3)]
+        await started.wait()
+        assert cache.stats()["coalesced"] == 2
+
+        cache.flights["key"].task.cancel()
+        results = await asyncio.wait_for(asyncio.gather(*subscribers, return_exceptions=True), timeout=5)
+        return cache, results
+
+    cache, results = asyncio.run(scenario())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert cache.stats()["in_flight"] == 0
+    # Nothing half-streamed was cached
+    assert cache.get("key") is None
+
+
+def test_failed_flight_is_raised_to_subscribers_and_not_cached():
+    async def failing():
+        yield "partial "
+        raise ConnectionError("upstream closed")
+
+    async def scenario():
+        cache = ChatResponseCache()
+        with pytest.raises(ConnectionError):
+            await _collect(cache.stream("key", failing))
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert cache.get("key") is None
+    assert cache.stats()["in_flight"] == 0
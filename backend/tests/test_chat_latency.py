@@ -0,0 +1,108 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core.config import CONFIG
+
+CHATS = 50
+# Upstream latency of each fake LLM answer: TOKENS chunks, TOKEN_DELAY seconds apart
+TOKENS = 30
+TOKEN_DELAY = 0.1
+
+DASHBOARD = [
+    f"/api/{path}?date=2026-01-{day:02d}"
+    for day in (20, 22, 24)
+    for path in ("overview/kpis", "overview/executive-summary", "queue/status", "security/summary", "trends/passenger")
+]
+
+
+class FakeCompletions:
+    """Stands in for AsyncOpenAI's chat.completions: streams a canned answer slowly."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def _chunks(self):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            for i in range(TOKENS):
+                await asyncio.sleep(TOKEN_DELAY)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=f"token{i} "))])
+        finally:
+            self.in_flight -= 1
+
+    async def create(self, **kwargs):
+        assert kwargs["stream"]
+        return self._chunks()
+
+
+class FakeClient:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=FakeCompletions())
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(CONFIG["ai"], "warmup", False)
+    monkeypatch.setitem(CONFIG["ai"]["precompute"], "enabled", False)
+    from backend.main import app
+    with TestClient(app) as c:
+        chatbot = app.state.chatbot
+        monkeypatch.setattr(chatbot, "client", FakeClient())
+        monkeypatch.setattr(chatbot, "model", "fake")
+        yield c
+
+
+def _p99(latencies):
+    return float(np.percentile(latencies, 99))
+
+
+def _dashboard_pass(client):
+    from backend.main import response_cache
+    # Every pass renders its endpoints again instead of replaying cached responses
+    response_cache.entries.clear()
+    latencies = []
+    for url in DASHBOARD:
+        start = time.perf_counter()
+        response = client.get(url)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, url
+    return latencies
+
+
+def test_dashboard_p99_holds_with_chats_in_flight(client):
+    completions = client.app.state.chatbot.client.chat.completions
+    _dashboard_pass(client)
+    idle = _dashboard_pass(client)
+
+    # Requests from these threads all run on the app's one event loop; distinct
+    # questions, so none of them share an upstream call
+    with ThreadPoolExecutor(max_workers=CHATS) as pool:
+        chats = [
+            pool.submit(client.post, "/api/chat/non-streaming", json={"query": f"How are queues at check-in? ({i})", "date": "2026-01-24"})
+            for i in range(CHATS)
+        ]
+        deadline = time.monotonic() + 30
+        while completions.in_flight < CHATS and time.monotonic() < deadline:
+            time.sleep(0.01)
+        loaded = _dashboard_pass(client)
+        # The whole loaded pass ran while every chat was waiting on the LLM
+        assert completions.in_flight == CHATS
+        responses = [chat.result() for chat in chats]
+
+    assert completions.peak == CHATS
+    assert all(r.status_code == 200 and r.json()["mode"] == "openai" for r in responses)
+
+    # A chat blocking the event loop would hold each dashboard request for a full LLM round trip
+    assert _p99(loaded) < TOKENS * TOKEN_DELAY / 10
+    assert _p99(loaded) < max(3 * _p99(idle), _p99(idle) + 0.05), (_p99(idle), _p99(loaded))
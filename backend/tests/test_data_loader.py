@@ -0,0 +1,55 @@
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from backend.core.config import CONFIG
+from backend.core.data_loader import DATASETS, DataLoader
+
+
+@pytest.fixture
+def cold_loader(monkeypatch):
+    # Every dataset in memory, none of them loaded yet
+    monkeypatch.setitem(CONFIG["data"], "mode", "eager")
+    monkeypatch.setitem(CONFIG["data"], "ipc_cache", False)
+    return DataLoader()
+
+
+def test_concurrent_first_hits_read_each_file_once(cold_loader, monkeypatch):
+    reads = Counter()
+    reads_lock = threading.Lock()
+    read = cold_loader._read
+
+    def counting_read(name):
+        with reads_lock:
+            reads[name] += 1
+        # Widen the window in which a second reader could slip past the lock
+        time.sleep(0.05)
+        return read(name)
+
+    monkeypatch.setattr(cold_loader, "_read", counting_read)
+
+    n_threads = 400
+    barrier = threading.Barrier(n_threads)
+    results = [None] * n_threads
+    errors = []
+
+    def hit(i):
+        try:
+            barrier.wait()
+            results[i] = cold_loader.frame(DATASETS[i % len(DATASETS)])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=hit, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert reads == Counter({name: 1 for name in DATASETS})
+    # Every caller got the one cached frame of its dataset
+    for i, df in enumerate(results):
+        assert df is cold_loader.frame(DATASETS[i % len(DATASETS)])
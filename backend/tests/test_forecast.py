@@ -0,0 +1,33 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core.config import CONFIG
+
+# Fewer than seven days of history up to these origins, so nothing can be fit
+EARLY_ORIGINS = ["2025-12-01", "2026-01-02", "2026-01-03"]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(CONFIG["ai"], "warmup", False)
+    monkeypatch.setitem(CONFIG["ai"]["precompute"], "enabled", False)
+    from backend.main import app
+    with TestClient(app) as c:
+        yield c
+
+
+def test_origin_before_the_history_window(client):
+    fitted = client.get("/api/forecast/summary", params={"date": "2026-01-24"}).json()["summary"][0]
+    for origin in EARLY_ORIGINS:
+        for name in ("pax", "queue", "atm"):
+            for format in ("records", "columnar"):
+                response = client.get(f"/api/forecast/{name}", params={"date": origin, "format": format})
+                assert response.status_code == 200, (name, origin, format)
+                assert response.json()["fit_mape"] is None
+            assert client.get(f"/api/forecast/{name}", params={"date": origin, "format": "arrow"}).status_code == 200
+
+        summary = client.get("/api/forecast/summary", params={"date": origin, "days": 3}).json()["summary"]
+        # Same fields as a day with a forecast, all empty
+        for day in summary:
+            assert day.keys() == fitted.keys()
+            assert all(value is None for key, value in day.items() if key != "date")
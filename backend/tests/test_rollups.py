@@ -0,0 +1,41 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+import pytest
+
+from backend.core.config import CONFIG
+from backend.core.data_loader import DataLoader
+from backend.core.rollups import MEAN_FIELDS, build_kpi_rollup
+
+
+@pytest.fixture(scope="module")
+def loader():
+    return DataLoader()
+
+
+def _decimal_mean(values):
+    mean = sum(Decimal(repr(value)) for value in values) / len(values)
+    return float(mean.quantize(Decimal("0.1"), rounding=ROUND_HALF_UP))
+
+
+@pytest.mark.parametrize("terminals", [["T1"], ["T2"], ["T1", "T2"], ["T2", "T1", "T2"]])
+def test_means_match_the_rows_they_summarize(loader, terminals):
+    rollup = loader.derived(build_kpi_rollup)
+    for name, (dataset, column) in MEAN_FIELDS.items():
+        df = loader.frame(dataset)
+        for date, rows in df[df["terminal"].astype(str).isin(terminals)].groupby("date"):
+            totals = rollup.totals(date, terminals)
+            values = rows[column].dropna().tolist()
+            assert totals[f"{name}_n"] == len(values)
+            assert totals[name] == _decimal_mean(values), (name, date)
+
+
+def test_terminal_order_and_duplicates_do_not_change_totals(loader):
+    rollup = loader.derived(build_kpi_rollup)
+    date = CONFIG["data"]["report_date"]
+    assert rollup.totals(date, ["T1", "T2"]) == rollup.totals(date, ["T2", "T1", "T1"])
+
+
+def test_unknown_date_has_no_means(loader):
+    totals = loader.derived(build_kpi_rollup).totals("1999-01-01", ["T1", "T2"])
+    assert totals["pax_total"] == 0
+    assert all(totals[name] is None and totals[f"{name}_n"] == 0 for name in MEAN_FIELDS)
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from backend.ai.root_cause import build_driver_panels, parse_time_window, root_cause_analysis
+from backend.core.data_loader import DataLoader
+
+DATE = pd.Timestamp("2026-01-24")
+ZONE = "Check-in 34-86"
+
+
+@pytest.fixture(scope="module")
+def panel():
+    return DataLoader().derived(build_driver_panels).for_date(DATE)
+
+
+@pytest.mark.parametrize("window", ["14-16", "1430-1530", "1400-1400", "2500-0100"])
+def test_time_window_must_be_whole_hours(window):
+    with pytest.raises(ValueError):
+        parse_time_window(window)
+
+
+def test_unknown_zone_is_rejected(panel):
+    with pytest.raises(ValueError, match="Unknown zone"):
+        root_cause_analysis(panel, DATE, "Check-in 34-8", "1400-1600")
+
+
+@pytest.mark.parametrize("window", ["0500-0700", "1400-1600", "1800-2000"])
+def test_only_upstream_metrics_are_drivers(panel, window):
+    result = root_cause_analysis(panel, DATE, ZONE, window)
+    assert all(driver["source"] != "queue_compliance" for driver in result["drivers"])
+    assert all(zone["source"] == "queue_compliance" and zone["entity"] != ZONE for zone in result["co_occurring"])
+    assert len(result["factors"]) == len(result["drivers"])
+
+
+def test_symptom_is_reported_without_a_baseline():
+    first = pd.Timestamp("2026-01-01")
+    panel = DataLoader().derived(build_driver_panels).for_date(first)
+    result = root_cause_analysis(panel, first, ZONE, "1400-1600")
+    assert result["compliance"] is not None
+    assert result["drivers"] == []
@@ -0,0 +1,57 @@
+from backend.ai.token_budget import PromptBudget, count_tokens, truncate_tokens
+
+SYSTEM = "You are an airport operations assistant. " * 20
+CONTEXT = ["Queue compliance was 91.2% across 12 zones on January 24. " * 10]
+
+
+def _history(turns: int):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"What happened at check-in zone {i} this morning?"})
+        history.append({"role": "assistant", "content": f"Zone {i} " + "saw a long queue after the bank of departures. " * 30})
+    return history
+
+
+def test_oversized_question_is_cut_to_the_budget():
+    query = "why are the queues so long " * 4000
+    prompt = PromptBudget(max_tokens=3000, query_tokens=500).assemble(SYSTEM, CONTEXT, None, query)
+
+    assert prompt.usage["query_truncated"]
+    assert prompt.usage["query"] <= 500 + 4
+    assert prompt.usage["prompt"] <= 3000
+    assert prompt.messages[-1]["content"].endswith("...")
+    assert query.startswith(prompt.messages[-1]["content"][:-3])
+
+
+def test_question_is_cut_to_what_the_system_prompt_leaves():
+    prompt = PromptBudget(max_tokens=300, query_tokens=500).assemble(SYSTEM, [], None, "queues " * 1000)
+    assert prompt.usage["prompt"] <= 300
+
+
+def test_short_question_is_sent_as_is():
+    prompt = PromptBudget().assemble(SYSTEM, CONTEXT, None, "How are queues today?")
+    assert not prompt.usage["query_truncated"]
+    assert prompt.messages[-1]["content"] == "How are queues today?"
+
+
+def test_summary_gets_its_room_when_turns_overflow():
+    prompt = PromptBudget(max_tokens=1500, summary_tokens=150).assemble(SYSTEM, CONTEXT, _history(8), "And now?")
+
+    assert prompt.usage["turns_sent"] > 0
+    assert prompt.usage["turns_summarized"] > 0
+    assert 0 < prompt.usage["summary"] <= 150
+    assert prompt.usage["prompt"] <= 1500
+    assert prompt.history[0]["content"].startswith("Earlier in this conversation")
+
+
+def test_nothing_is_set_aside_when_every_turn_fits():
+    history = _history(1)
+    prompt = PromptBudget(max_tokens=3000, summary_tokens=150).assemble(SYSTEM, CONTEXT, history, "And now?")
+    assert prompt.usage["turns_sent"] == 2
+    assert prompt.usage["summary"] == 0
+
+
+def test_truncate_and_count_agree():
+    text = "Terminal 2 check-in 34-86 had 1,234 passengers waiting; " * 50
+    for limit in (5, 37, 200):
+        assert count_tokens(truncate_tokens(text, limit)) <= limit
@@ -11,6 +11,15 @@ import yaml
 class BaseDataGenerator:
     """Base class for all data generators"""
 
+    # Low-cardinality label columns written as dictionary-encoded categoricals
+    # so that pd.read_parquet returns them as `category` dtype
+    CATEGORICAL_COLUMNS = [
+        'terminal', 'flow', 'passenger_type', 'type', 'checkpoint', 'airline',
+        'zone', 'zone_type', 'time_window', 'lane', 'lane_group',
+        'belt', 'belt_type', 'gate', 'boarding_mode', 'channel',
+        'department', 'media_type', 'media', 'sentiment',
+    ]
+
     def __init__(self, config_path: str = "config.yaml"):
         """Initialize with configuration"""
         # Handle relative paths from different locations
@@ -129,11 +138,89 @@ class BaseDataGenerator:
         print(f"✓ Generated: {filename} ({len(df):,} rows)")
         return output_path
 
-    def save_to_parquet(self, df: pd.DataFrame, filename: str):
-        """Save DataFrame to Parquet in the generated folder"""
+    def save_to_parquet(self, df: pd.DataFrame, filename: str, partitioned: bool = None):
+        """
+        Save DataFrame to Parquet in the generated folder
+
+        Args:
+            df: DataFrame to save
+            filename: Output file name, e.g. 'atm_daily.parquet'
+            partitioned: Write a Hive-partitioned dataset
+                         (dataset=<name>/month=YYYY-MM/part-N.parquet) instead of
+                         a single file. Defaults to data.output.partitioned in config.
+
+        Rows are sorted by date and written in fixed-size row groups so that the
+        per-row-group min/max statistics let readers skip everything outside a
+        requested date range. A write replaces the whole dataset in either layout,
+        so no months or files from an earlier run are left for the loader to pick up.
+        """
+        import inspect
         import os
+        import shutil
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        output_config = self.config['data'].get('output', {})
+        if partitioned is None:
+            partitioned = output_config.get('partitioned', False)
+        compression = output_config.get('compression', 'zstd')
+        row_group_size = output_config.get('row_group_size', 16_384)
+
         project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        output_path = os.path.join(project_root, "data", "generated", filename)
-        df.to_parquet(output_path, index=False)
-        print(f"✓ Generated: {filename} ({len(df):,} rows)")
+        generated_dir = os.path.join(project_root, "data", "generated")
+
+        categorical = [col for col in self.CATEGORICAL_COLUMNS if col in df.columns]
+        df = df.astype({col: 'category' for col in categorical})
+        if 'date' in df.columns:
+            df = df.sort_values('date', kind='stable')
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        name = os.path.splitext(filename)[0]
+        flat_path = os.path.join(generated_dir, filename)
+        partitioned_path = os.path.join(generated_dir, f"dataset={name}")
+
+        if not partitioned:
+            # The loader prefers the directory layout, so a stale one would hide this file
+            shutil.rmtree(partitioned_path, ignore_errors=True)
+            output_path = flat_path
+            pq.write_table(table, output_path, compression=compression,
+                           use_dictionary=categorical or False, row_group_size=row_group_size)
+            print(f"✓ Generated: {filename} ({len(df):,} rows)")
+            return output_path
+
+        output_path = partitioned_path
+        months = pd.to_datetime(df['date']).dt.strftime('%Y-%m')
+        table = table.append_column('month', pa.array(months.to_numpy(), type=pa.string()))
+        file_options = ds.ParquetFileFormat().make_write_options(
+            compression=compression, use_dictionary=categorical or False)
+        write_options = {}
+        if 'preserve_order' in inspect.signature(ds.write_dataset).parameters:
+            # Without it the writer may reorder batches and lose the date sort
+            write_options['preserve_order'] = True
+
+        # Written next to the live dataset and swapped in, so months from an earlier
+        # run never survive and a watching loader never sees a half-written directory
+        staging_path = f"{output_path}.{os.getpid()}.tmp"
+        shutil.rmtree(staging_path, ignore_errors=True)
+        ds.write_dataset(
+            table,
+            staging_path,
+            format='parquet',
+            partitioning=ds.partitioning(pa.schema([('month', pa.string())]), flavor='hive'),
+            basename_template='part-{i}.parquet',
+            existing_data_behavior='error',
+            file_options=file_options,
+            max_rows_per_group=row_group_size,
+            min_rows_per_group=min(row_group_size, len(df)) or 1,
+            **write_options,
+        )
+        retired_path = f"{output_path}.{os.getpid()}.old"
+        if os.path.isdir(output_path):
+            os.replace(output_path, retired_path)
+        os.replace(staging_path, output_path)
+        shutil.rmtree(retired_path, ignore_errors=True)
+        if os.path.exists(flat_path):
+            os.remove(flat_path)
+        print(f"✓ Generated: dataset={name}/ ({len(df):,} rows, {months.nunique()} months)")
         return output_path
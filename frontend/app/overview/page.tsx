@@ -32,6 +32,15 @@ interface ExecSummary {
   actions: { priority: string; action: string }[];
 }
 
+interface OverviewPageData {
+  kpis: OverviewKPIs;
+  "executive-summary": ExecSummary;
+  "pax-trend": { data: TrendPoint[] };
+  "atm-trend": { data: TrendPoint[] };
+  "zone-compliance-summary": { data: ZoneCompliance[] };
+  alerts: { queue_alerts: QueueAlert[]; security_alerts: SecurityAlert[] };
+}
+
 const statusConfig = {
   on_track: { icon: CheckCircle2, color: "text-emerald-400", bg: "bg-emerald-500/10", border: "border-emerald-500/30", badge: "bg-emerald-500/20 text-emerald-400" },
   attention: { icon: AlertTriangle, color: "text-amber-400", bg: "bg-amber-500/10", border: "border-amber-500/30", badge: "bg-amber-500/20 text-amber-400" },
@@ -46,12 +55,14 @@ const priorityColors: Record<string, string> = {
 
 export default function OverviewPage() {
   const date = DEFAULT_REPORT_DATE;
-  const { data: kpis, isLoading: kpiLoading } = useApi<OverviewKPIs>("/api/overview/kpis", { date });
-  const { data: summary } = useApi<ExecSummary>("/api/overview/executive-summary", { date });
-  const { data: paxTrend } = useApi<{ data: TrendPoint[] }>("/api/overview/pax-trend", { days: 15, end_date: date });
-  const { data: atmTrend } = useApi<{ data: TrendPoint[] }>("/api/overview/atm-trend", { days: 15, end_date: date });
-  const { data: zoneCompliance } = useApi<{ data: ZoneCompliance[] }>("/api/overview/zone-compliance-summary", { date });
-  const { data: alerts } = useApi<{ queue_alerts: QueueAlert[]; security_alerts: SecurityAlert[] }>("/api/overview/alerts", { date });
+  // Every overview widget in one round trip
+  const { data: page, isLoading: kpiLoading } = useApi<OverviewPageData>("/api/pages/overview", { date, days: 15 });
+  const kpis = page?.kpis;
+  const summary = page?.["executive-summary"];
+  const paxTrend = page?.["pax-trend"];
+  const atmTrend = page?.["atm-trend"];
+  const zoneCompliance = page?.["zone-compliance-summary"];
+  const alerts = page?.alerts;
 
   const sc = summary ? statusConfig[summary.status as keyof typeof statusConfig] || statusConfig.on_track : null;
 
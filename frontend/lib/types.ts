@@ -52,11 +52,27 @@ export interface QueueStatus {
   target_achievement_pct: number;
 }
 
+export interface RootCauseDriver {
+  rank: number;
+  source: string;
+  factor: string;
+  entity: string;
+  unit: string;
+  value: number;
+  baseline: number;
+  change_pct: number;
+  z_score: number;
+  baseline_days: number;
+}
+
 export interface RootCause {
   zone: string;
   time_window: string;
   primary_issue: string;
+  compliance: number | null;
   factors: string[];
+  drivers: RootCauseDriver[];
+  co_occurring: RootCauseDriver[];
   impact: string;
   recommendations: string[];
   severity: string;